@@ -1,57 +1,108 @@
+import asyncio
+import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Annotated
 sys.path.append(os.path.dirname(__file__)) 
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import Body, FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 from fastapi.middleware.cors import CORSMiddleware 
 
-from backend.core.rag.financial_workflow import app as financial_rag_app
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger("financial_rag")
 
-origins = [
-    "*",  # Allows all origins. For production, you might want to restrict this
-          # to your actual frontend domain, e.g., "https://yourapp.com"
-]
+
+# Blocking data-source tools and LLM calls run through asyncio.to_thread, i.e.
+# the loop's default executor. Size it for several concurrent queries, each
+# fanning out to a handful of tools, instead of the cpu_count-based default.
+TOOL_THREAD_POOL_SIZE = int(os.getenv("TOOL_THREAD_POOL_SIZE", "64"))
+
+# In production the frontend and API share an origin (see vercel.json), so CORS
+# only matters for local development and any extra frontends listed in
+# CORS_ALLOW_ORIGINS (comma-separated). A wildcard is not used because it is
+# invalid together with allow_credentials.
+origins = [o.strip() for o in os.getenv("CORS_ALLOW_ORIGINS", "").split(",") if o.strip()]
+local_origin_regex = r"^https?://(localhost|127\.0\.0\.1)(:\d+)?$"
+
+@lru_cache(maxsize=1)
+def get_rag_app():
+    """
+    Imports and compiles the LangGraph workflow on first use. Keeping it out of
+    module scope lets uvicorn workers (and reloads) come up without paying for
+    the graph and all data-source clients at import time.
+    """
+    from backend.core.rag.financial_workflow import app as financial_rag_app
+    return financial_rag_app
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=TOOL_THREAD_POOL_SIZE, thread_name_prefix="tool")
+    )
+    # Build the workflow once per worker before serving traffic.
+    app.state.rag = get_rag_app()
+    yield
+    # Stop the FRED selection batcher, then close pooled HTTP clients shared
+    # by the data-source tools.
+    from backend.core.data_sources import coindesk, fred, newsapi
+    await coindesk.aclose_client()
+    await fred.aclose_selection_batcher()
+    await fred.aclose_client()
+    await newsapi.aclose_client()
 
 # Initialize FastAPI Application
 app = FastAPI(
     title="Financial RAG API",
     description="An API for a financial assistant using Adaptive, Self, and Corrective RAG.",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
+    allow_origin_regex=local_origin_regex,
     allow_credentials=True,
-    allow_methods=["*"],  # Allows all methods (GET, POST, OPTIONS, etc.)
-    allow_headers=["*"],  # Allows all headers
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type"],
 )
 
 # Define API Request and Response Models
 class QueryRequest(BaseModel):
+    # Request bodies are read once and never mutated; unknown fields are
+    # dropped instead of being carried around on the instance.
+    model_config = ConfigDict(extra="ignore", frozen=True, validate_assignment=False)
+
     query: str
     api_key: str
 
 class QueryResponse(BaseModel):
     answer: str
 
-@app.post("/backend/query", response_model=QueryResponse)
-async def handle_query(request: QueryRequest):
+# QueryResponse is only used to document the endpoint; the handler returns an
+# ORJSONResponse directly so FastAPI skips re-validating and re-encoding it.
+@app.post("/backend/query", responses={200: {"model": QueryResponse}})
+async def handle_query(request: Annotated[QueryRequest, Body()]):
     try:
-        print(f"🚀 Received API query: '{request.query}'")
+        logger.info("Received API query: %s", request.query)
         inputs = {
             "user_question": request.query,
             "google_api_key": request.api_key 
         }
-        final_state = await financial_rag_app.ainvoke(inputs, {"recursion_limit": 15})
+        final_state = await get_rag_app().ainvoke(inputs, {"recursion_limit": 15})
         answer = final_state.get("final_answer", "Sorry, I could not find enough information to answer.")
-        print("✅ Sending API response.")
-        return QueryResponse(answer=answer)
+        logger.info("Sending API response.")
+        return ORJSONResponse({"answer": answer})
     except Exception as e:
-        print(f"🚨 An error occurred in the API: {e}")
+        logger.exception("An error occurred in the API: %s", e)
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {str(e)}")
 
 @app.get("/backend/", include_in_schema=False)
-def root():
+async def root():
     return {"message": "Financial RAG API is running. Go to /docs for the API documentation."}
@@ -1,9 +1,10 @@
 # config.py
 
 import os
+from functools import lru_cache
 from pathlib import Path  # Import the Path object
 from pydantic import Field
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
 # --- The Key Fix ---
@@ -16,12 +17,17 @@ this_directory = Path(__file__).parent
 # 2. Construct the full, absolute path to the .env file.
 dotenv_path = this_directory / ".env"
 
-# 3. Load the .env file using its full path.
-load_dotenv(dotenv_path=dotenv_path)
+# 3. Load the .env file using its full path, but only when the environment
+#    has not already been populated (e.g. by the deployment platform or by a
+#    parent process before uvicorn forked its workers).
+if not os.getenv("GOOGLE_API_KEY"):
+    load_dotenv(dotenv_path=dotenv_path, override=False)
 # --- End of Fix ---
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=dotenv_path, extra="ignore", frozen=True)
+
     # API Keys
     # MISTRAL_API_KEY: str = Field(..., env="MISTRAL_API_KEY")
     GOOGLE_API_KEY: str = Field(..., env="GOOGLE_API_KEY")
@@ -41,4 +47,19 @@ class Settings(BaseSettings):
     # KITE_API_TOKEN = "TEMP_TOKEN"
     # KITE_API_SECRET = "TEMP_SECRET"
 
-settings = Settings()
\ No newline at end of file
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Returns the process-wide Settings instance.
+    It is built once on first use; forked workers share the parent's copy.
+    """
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Keeps `from backend.config import settings` working without
+    # validating the environment at import time.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,19 @@
+# backend/core/data_sources/_http.py
+
+"""
+Connection-pool tuning for the third-party SDK clients used by the data sources.
+"""
+
+import urllib3
+
+POOL_MAXSIZE = 50
+
+
+def tune(pool_manager: urllib3.PoolManager, maxsize: int = POOL_MAXSIZE) -> None:
+    """
+    Lets every per-host pool of `pool_manager` keep up to `maxsize` keep-alive
+    connections. urllib3 defaults to one, so concurrent requests from worker
+    threads would open (and then discard) a fresh TLS connection each time.
+    Must be called before the first request, when the host pools are created.
+    """
+    pool_manager.connection_pool_kw["maxsize"] = maxsize
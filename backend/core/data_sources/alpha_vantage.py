@@ -1,43 +1,88 @@
 # # backend/core/data_sources/alpha_vantage.py
 
-# from alpha_vantage.techindicators import TechIndicators
+# import asyncio
+# import httpx
+# import msgspec
 # from backend.config import settings
-# # 1. Import the new multi-ticker extraction function
-# from .yahoo_finance import _get_tickers_from_gemini
+# # 1. Reuse the central entity extractor (or the entities the workflow already extracted)
+# from .yahoo_finance import extract_financial_entities
 
-# def get_technical_indicators(query: str) -> str:
+# ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+# # The free tier is heavily rate limited; never have more than this many requests in flight.
+# _MAX_CONCURRENT_REQUESTS = 5
+
+# # Each indicator endpoint returns {"Technical Analysis: <NAME>": {date: {field: "value"}}}.
+# # Decoding straight into these Structs skips building a pandas DataFrame for two numbers.
+# class _RSIPayload(msgspec.Struct):
+#     series: dict[str, dict[str, str]] = msgspec.field(default={}, name="Technical Analysis: RSI")
+
+# class _MACDPayload(msgspec.Struct):
+#     series: dict[str, dict[str, str]] = msgspec.field(default={}, name="Technical Analysis: MACD")
+
+# # (function, extra params, payload type, field to read, label, format)
+# _INDICATORS = [
+#     ("RSI", {"time_period": 14}, _RSIPayload, "RSI", "RSI (14-day)", "{:.2f}"),
+#     ("MACD", {}, _MACDPayload, "MACD", "MACD", "{:.2f}"),
+# ]
+
+# async def _fetch_indicator(client, semaphore, ticker_symbol, function, extra_params, payload_type, field):
+#     params = {
+#         "function": function,
+#         "symbol": ticker_symbol,
+#         "interval": "daily",
+#         "series_type": "close",
+#         "apikey": settings.ALPHA_VANTAGE_API_KEY,
+#         **extra_params,
+#     }
+#     async with semaphore:
+#         response = await client.get(ALPHA_VANTAGE_URL, params=params)
+#     response.raise_for_status()
+#     series = msgspec.json.decode(response.content, type=payload_type).series
+#     if not series:
+#         raise ValueError(f"no {function} data returned")
+#     # Dates are ISO formatted, so the lexicographic max is the latest observation.
+#     return float(series[max(series)][field])
+
+# async def get_technical_indicators(query: str, api_key: str, entities: dict | None = None) -> str:
 #     """
 #     Fetches technical indicators for ALL tickers identified in the query.
+#     Every (ticker, indicator) request is issued concurrently.
 #     """
-#     # 2. Use the new function to get a list of tickers
-#     ticker_symbols = _get_tickers_from_gemini(query)
-    
+#     # 2. Use the central extractor to get a list of tickers
+#     if entities is None:
+#         entities = await asyncio.to_thread(extract_financial_entities, query, api_key)
+#     ticker_symbols = entities.get("tickers", [])
+
 #     if not ticker_symbols:
 #         return "Could not identify any specific stock tickers for technical analysis."
 
 #     print(f"[Alpha Vantage] Gemini identified tickers: {ticker_symbols}")
-    
+
+#     # 3. Issue all (ticker, indicator) requests at once, bounded by the rate-limit semaphore
+#     semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+#     async with httpx.AsyncClient(timeout=15) as client:
+#         results = await asyncio.gather(
+#             *(
+#                 _fetch_indicator(client, semaphore, ticker_symbol, function, extra_params, payload_type, field)
+#                 for ticker_symbol in ticker_symbols
+#                 for function, extra_params, payload_type, field, _, _ in _INDICATORS
+#             ),
+#             return_exceptions=True,
+#         )
+
 #     all_summaries = []
-#     # 3. Loop through each identified ticker
-#     for ticker_symbol in ticker_symbols:
-#         try:
-#             ti = TechIndicators(key=settings.ALPHA_VANTAGE_API_KEY, output_format='pandas')
-#             summary_parts = [f"Alpha Vantage Technical Indicators for {ticker_symbol}:"]
-
-#             # Fetch RSI
-#             data_rsi, _ = ti.get_rsi(symbol=ticker_symbol, interval='daily', time_period=14)
-#             latest_rsi = data_rsi['RSI'].iloc[-1]
-#             summary_parts.append(f"- RSI (14-day): {latest_rsi:.2f}")
-
-#             # Fetch MACD
-#             data_macd, _ = ti.get_macd(symbol=ticker_symbol, interval='daily')
-#             latest_macd = data_macd['MACD'].iloc[-1]
-#             summary_parts.append(f"- MACD: {latest_macd:.2f}")
-            
-#             all_summaries.append("\n".join(summary_parts))
-#         except Exception as e:
+#     for i, ticker_symbol in enumerate(ticker_symbols):
+#         ticker_results = results[i * len(_INDICATORS):(i + 1) * len(_INDICATORS)]
+#         errors = [r for r in ticker_results if isinstance(r, Exception)]
+#         if errors:
 #             # Add specific error messages for each ticker that fails
-#             all_summaries.append(f"Error fetching technical indicators for {ticker_symbol}: {e}. The Alpha Vantage free tier is very limited.")
+#             all_summaries.append(f"Error fetching technical indicators for {ticker_symbol}: {errors[0]}. The Alpha Vantage free tier is very limited.")
+#             continue
+
+#         summary_parts = [f"Alpha Vantage Technical Indicators for {ticker_symbol}:"]
+#         for value, (_, _, _, _, label, fmt) in zip(ticker_results, _INDICATORS):
+#             summary_parts.append(f"- {label}: {fmt.format(value)}")
+#         all_summaries.append("\n".join(summary_parts))
 
 #     # 4. Join all the individual summaries into one final string
 #     return "\n\n---\n\n".join(all_summaries)
\ No newline at end of file
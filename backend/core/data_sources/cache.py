@@ -0,0 +1,72 @@
+# backend/core/data_sources/cache.py
+
+"""
+A small persistent cache for data-source responses.
+
+Entries are JSON files of the form {"timestamp": ..., "payload": ...} under
+`$CACHE_DIR/<namespace>/` (default `.cache/`), named by a hash of the key.
+The cache is best-effort: unreadable, corrupt or expired entries are misses,
+and failed writes (e.g. on a read-only serverless filesystem) are ignored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.getenv("CACHE_DIR", ".cache"))
+
+
+class FileCache:
+    def __init__(self, namespace: str):
+        self.directory = CACHE_DIR / namespace
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    def get(self, key: str, ttl_seconds: float) -> Optional[Any]:
+        """Returns the payload stored under `key` if it is younger than `ttl_seconds`, else None."""
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("timestamp", 0) > ttl_seconds:
+            return None
+        return entry.get("payload")
+
+    def set(self, key: str, value: Any) -> None:
+        """Stores a JSON-serializable `value` under `key`; values that aren't are skipped."""
+        try:
+            entry = json.dumps({"timestamp": time.time(), "payload": value})
+        except (TypeError, ValueError) as e:
+            log.warning("Not caching unserializable value in %s: %s", self.directory, e)
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename, so readers never see a partial entry.
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(entry)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            log.warning("Could not write cache entry in %s: %s", self.directory, e)
+
+    def get_or_fetch(self, key: str, ttl_seconds: float, fetch: Callable[[], Any]) -> Any:
+        """
+        Returns the fresh payload under `key`, or calls `fetch` and caches its
+        result. Empty results (None, {}, []) are returned but not cached, since
+        they are usually transient upstream failures.
+        """
+        value = self.get(key, ttl_seconds)
+        if value is None:
+            value = fetch()
+            if value:
+                self.set(key, value)
+        return value
@@ -1,93 +1,265 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 
-import requests 
+import asyncio
+from functools import lru_cache
+import httpx
+import io
+import msgspec
+import re
+from cachetools import LRUCache, TTLCache
 from backend.config import settings
-from datetime import datetime
+import time
 
 coindesk_api_key = settings.COINDESK_API_KEY
+
+# Shared async client so concurrent tool calls reuse pooled keep-alive
+# connections (and the TLS handshake) to CryptoCompare. Created lazily and
+# closed by the API's shutdown hook via `aclose_client()`.
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def aclose_client() -> None:
+    """Closes the shared CryptoCompare HTTP client, if one was opened."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+# Prices are re-requested constantly for the same pairs; a few seconds of
+# staleness is acceptable and saves a CryptoCompare round-trip per query.
+_tick_cache: TTLCache = TTLCache(maxsize=256, ttl=10)
+_tick_inflight: dict[tuple[str, ...], asyncio.Future] = {}
+
+# Instrument extraction is deterministic enough to memoize by normalized
+# question text, which skips the Gemini round-trip for repeat questions.
+_instrument_cache: LRUCache = LRUCache(maxsize=1024)
+_instrument_inflight: dict[str, asyncio.Future] = {}
+_NON_WORD_RE = re.compile(r'\W+')
+
+
+async def _single_flight(cache, inflight: dict, key, fetch):
+    """
+    Returns `cache[key]`, or awaits `fetch()` and caches a truthy result.
+    Concurrent misses for the same key share one in-flight task.
+    """
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        inflight[key] = task
+
+        def _done(t: asyncio.Future) -> None:
+            inflight.pop(key, None)
+            # Mark the exception as retrieved even if every waiter went away.
+            if not t.cancelled():
+                t.exception()
+
+        task.add_done_callback(_done)
+
+    result = await asyncio.shield(task)
+    if result:
+        cache[key] = result
+    return result
+
 # google_client = ChatGoogleGenerativeAI(
 #     model="gemini-2.5-flash-lite", api_key=settings.GOOGLE_API_KEY
 # )
 
 
-def get_instruments(prompt: str, api_key: str) -> list[str]:
-    instrument_prompt = f"""From the user's financial question below, extract the cryptocurrency instrument tickers.
+# The basket returned for general crypto questions (see the prompt below).
+DEFAULT_INSTRUMENTS = [("BTC", "USD"), ("ETH", "USD"), ("SOL", "USD"), ("XRP", "USD"), ("DOGE", "USD")]
+
+_INSTRUMENT_TEMPLATE = ChatPromptTemplate.from_template(
+    """From the user's financial question below, extract the cryptocurrency instrument tickers.
 - Format: BASE-QUOTE (BTC-USD, ETH-EUR).
 - Default quote currency: USD.
-- If general query, return: BTC-USD,ETH-USD,SOL-USD,XRP-USD,DOGE-USD.
-- For "price of ethereum", return ETH-USD.
+- If general query, return: ["BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD", "DOGE-USD"].
+- For "price of ethereum", return ["ETH-USD"].
 
 User Question: "{prompt}"
 
-Return only a comma-separated list of tickers.
+Return a JSON array of tickers.
 """
-    google_client = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", api_key=api_key)
-    chat_prompt = ChatPromptTemplate.from_template(instrument_prompt)
-    response = google_client.generate(
-        [{"role": "user", "content": chat_prompt.format()}]
+)
+
+
+# Constrains Gemini to emit a JSON array of strings, so the reply can be
+# decoded directly instead of being split and cleaned up as free text.
+_INSTRUMENT_RESPONSE_SCHEMA = {"type": "array", "items": {"type": "string"}}
+_instrument_list_decoder = msgspec.json.Decoder(list[str])
+# Markdown fences, brackets and quotes around a list the decoder rejected.
+_LIST_NOISE_RE = re.compile(r'```(?:json)?|[\[\]"]')
+
+
+@lru_cache(maxsize=8)
+def _get_google_client(api_key: str) -> ChatGoogleGenerativeAI:
+    # One client per user key, so repeat queries reuse its HTTP connection.
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash-lite",
+        api_key=api_key,
+        response_mime_type="application/json",
+        response_schema=_INSTRUMENT_RESPONSE_SCHEMA,
     )
 
+
+def _split_instrument(instrument: str) -> tuple[str, str]:
+    """Splits "BTC-USD" into ("BTC", "USD"); a bare base symbol is quoted in USD."""
+    base, _, quote = instrument.strip().upper().partition('-')
+    return base, quote or "USD"
+
+
+async def get_instruments(prompt: str, api_key: str) -> list[tuple[str, str]]:
+    key = _NON_WORD_RE.sub(' ', prompt.lower()).strip()
+    instruments = await _single_flight(
+        _instrument_cache, _instrument_inflight, key,
+        lambda: _extract_instruments(prompt, api_key),
+    )
+    return list(instruments)
+
+
+async def _extract_instruments(prompt: str, api_key: str) -> tuple[tuple[str, str], ...]:
+    google_client = _get_google_client(api_key)
+    response = await google_client.ainvoke(_INSTRUMENT_TEMPLATE.format_messages(prompt=prompt))
+
+    content = response.content
+    if isinstance(content, list):
+        instruments_text = "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+        )
+    else:
+        instruments_text = str(content)
+
     try:
-        gen = response.generations
-        if isinstance(gen, list) and gen and isinstance(gen[0], list):
-            instruments_text = gen[0][0].text
-        else:
-            instruments_text = gen[0].text
-    except Exception:
-        instruments_text = str(response)
+        instruments = _instrument_list_decoder.decode(instruments_text)
+    except msgspec.DecodeError:
+        # Should not happen with a JSON response schema; degrade to the old
+        # comma-separated parsing rather than failing the whole tool call.
+        instruments = _LIST_NOISE_RE.sub('', instruments_text).split(",")
+
+    return tuple(_split_instrument(i) for i in instruments if i.strip())
+
+
+class _RawTick(msgspec.Struct):
+    PRICE: float | None = None
+    LASTUPDATE: int = 0
+
+
+class _PriceMultiFull(msgspec.Struct):
+    """The subset of the `pricemultifull` payload we read; other fields are skipped."""
+    RAW: dict[str, dict[str, _RawTick]] = {}
+    Response: str | None = None
+    Message: str | None = None
+
+
+_payload_decoder = msgspec.json.Decoder(_PriceMultiFull)
+
+
+_TIME_FORMAT = '%Y-%m-%d %H:%M:%S UTC'
+
+
+def _format_price(price: float | None) -> str:
+    return "$" + format(price, ",.2f") if price is not None else "N/A"
+
 
-    return [i.strip().upper() for i in instruments_text.split(",") if i.strip()]
+class _TickDataError(Exception):
+    """An error reported by CryptoCompare itself; returned to the caller but never cached."""
 
 
-def get_latest_tick_data(prompt: str) -> str:
+async def _fetch_tick_data(instruments: list[tuple[str, str]]) -> str:
+    api_url = "https://min-api.cryptocompare.com/data/pricemultifull"
+    # Instruments are already split into (base, quote) pairs. Dedup in one
+    # pass and sort so the same basket always produces the same fsyms/tsyms.
+    base_symbols = sorted(dict.fromkeys(base for base, _ in instruments))
+    quote_symbols = sorted(dict.fromkeys(quote for _, quote in instruments))
+
+    params = {
+        "fsyms": ",".join(base_symbols),
+        "tsyms": ",".join(quote_symbols),
+        "api_key": coindesk_api_key
+    }
+    
+    response = await _get_client().get(api_url, params=params)
+    response.raise_for_status()
+    payload = _payload_decoder.decode(response.content)
+
+    if payload.Response == "Error":
+        raise _TickDataError(f"CryptoCompare API returned an error: {payload.Message}")
+
+    raw_data = payload.RAW
+    if not raw_data:
+        instruments_query = ",".join(f"{base}-{quote}" for base, quote in instruments)
+        raise _TickDataError(f"Could not find RAW data for instruments {instruments_query}.")
+
+    # Write header, entries and separators into one buffer instead of joining
+    # the entries and then copying the result again to prepend the header.
+    buf = io.StringIO()
+    buf.write("CryptoCompare Data:\n\n")
+    separator = ""
+    for base_sym, quote_map in raw_data.items():
+        for quote_sym, data in quote_map.items():
+            buf.write(separator)
+            buf.write(
+                f"Instrument: {base_sym}-{quote_sym}\n"
+                f"- Price: {_format_price(data.PRICE)}\n"
+                f"- Last Updated: {time.strftime(_TIME_FORMAT, time.gmtime(data.LASTUPDATE))}"
+            )
+            separator = "\n\n---\n\n"
+
+    return buf.getvalue()
+
+
+async def _get_tick_data(instruments: list[tuple[str, str]]) -> str:
+    """
+    Returns formatted tick data from the short-lived cache, fetching on a miss.
+    Concurrent misses for the same instruments share a single in-flight request.
+    """
+    key = tuple(sorted(instruments))
+    return await _single_flight(_tick_cache, _tick_inflight, key, lambda: _fetch_tick_data(list(key)))
+
+
+async def get_latest_tick_data(prompt: str, api_key: str, entities: dict | None = None) -> str:
     try:
-        instruments = get_instruments(prompt)
+        # Prefer the crypto instruments already extracted by the workflow; only
+        # fall back to a dedicated Gemini call when there are none.
+        instruments = [_split_instrument(i) for i in (entities or {}).get("crypto") or []]
+        if instruments:
+            return await _get_tick_data(instruments)
+
+        # Speculatively fetch the default basket while Gemini extracts the
+        # instruments, so general questions cost max(LLM, HTTP) instead of the sum.
+        default_task = asyncio.ensure_future(_get_tick_data(DEFAULT_INSTRUMENTS))
+        try:
+            instruments = await get_instruments(prompt, api_key)
+        except BaseException:
+            default_task.cancel()
+            raise
+        if sorted(instruments) == sorted(DEFAULT_INSTRUMENTS):
+            return await default_task
+        default_task.cancel()
+
         if not instruments:
             return "Could not identify any cryptocurrency instruments in the query."
 
-        instruments_query = ",".join(instruments)
-
-        api_url = "https://min-api.cryptocompare.com/data/pricemultifull"
-        base_symbols = list(set([i.split('-')[0] for i in instruments]))
-        quote_symbols = list(set([i.split('-')[1] for i in instruments]))
-
-        params = {
-            "fsyms": ",".join(base_symbols),
-            "tsyms": ",".join(quote_symbols),
-            "api_key": coindesk_api_key
-        }
-        
-        response = requests.get(api_url, params=params)
-        response.raise_for_status()
-        json_data = response.json()
-
-        if json_data.get("Response") == "Error":
-            return f"CryptoCompare API returned an error: {json_data.get('Message')}"
-
-        raw_data = json_data.get("RAW", {})
-        if not raw_data:
-            return f"Could not find RAW data for instruments {instruments_query}."
-
-        formatted = []
-        for base_sym, quote_map in raw_data.items():
-            for quote_sym, data in quote_map.items():
-                instrument_name = f"{base_sym}-{quote_sym}"
-                price = data.get("PRICE", "N/A")
-                ts = data.get("LASTUPDATE", 0)
-                dt_object = datetime.fromtimestamp(ts)
-                time_str = dt_object.strftime('%Y-%m-%d %H:%M:%S UTC')
-                price_str = f"${price:,.2f}" if isinstance(price, (float, int)) else "N/A"
-
-                formatted.append(
-                    f"Instrument: {instrument_name}\n"
-                    f"- Price: {price_str}\n"
-                    f"- Last Updated: {time_str}"
-                )
-
-        return "CryptoCompare Data:\n\n" + "\n\n---\n\n".join(formatted)
-
-    except requests.exceptions.HTTPError as http_err:
-        return f"CryptoCompare API request failed: {http_err}. Response: {response.text}"
+        return await _get_tick_data(instruments)
+
+    except _TickDataError as api_err:
+        return str(api_err)
+    except httpx.HTTPStatusError as http_err:
+        return f"CryptoCompare API request failed: {http_err}. Response: {http_err.response.text}"
     except Exception as e:
         return f"An error occurred in the CryptoCompare tool: {e}"
@@ -13,19 +13,328 @@ The LLM is initialized dynamically per-request to support user-provided API keys
 ensuring that the backend does not rely on a hardcoded system key for model inference.
 """
 
-from fredapi import Fred
+import asyncio
+import httpx
+import orjson
 from backend.config import settings
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+import hashlib
+import math
+import re
+import sys
+import threading
+from cachetools import LRUCache, TTLCache
+from datetime import date, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Set, Callable, Awaitable, Final, Mapping
 import logging
 
-# Configure logging for the FRED module
-logging.basicConfig(level=logging.INFO)
+# Module logger; handlers and levels are configured by the application.
 logger = logging.getLogger(__name__)
 
+# Observation window for price indices: enough months (13+) for a
+# year-over-year change.
+INFLATION_WINDOW_DAYS = 450
+
+# Standard series only need their latest two values, which are requested
+# newest-first straight from the observations endpoint. A few extra rows
+# cover the "." placeholders FRED returns for missing (e.g. holiday) values.
+LATEST_OBSERVATIONS_LIMIT = 5
+
+# All FRED requests go to this API root and are retried with exponential
+# backoff on rate limiting and transient server errors.
+FRED_API_URL = "https://api.stlouisfed.org/fred"
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3
+
+# One pooled HTTP/2 client per event loop (the API's loop, or the short-lived
+# loop of a sync `get_economic_data` call), so the series info, observations
+# and search requests of a query are multiplexed over one connection.
+# Entries are removed by `aclose_client()` before their loop shuts down.
+_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+# Concurrent LLM series selections are sent to Gemini together: up to this
+# many prompts per batch, waiting at most this many seconds to fill one.
+SELECTION_BATCH_SIZE = 32
+SELECTION_BATCH_WAIT = 0.2
+
+# Search results whose title closely matches the query are picked locally;
+# the LLM chooser is only consulted when the best match scores below this.
+LOCAL_MATCH_THRESHOLD = 0.45
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "by", "current", "currently", "data",
+    "for", "from", "how", "in", "is", "it", "latest", "me", "much", "now", "of",
+    "on", "s", "show", "tell", "the", "to", "today", "us", "was", "what", "whats",
+    "which", "with",
+})
+
+
+@lru_cache(maxsize=4)
+def _window_dates_for(today_ordinal: int, window_days: int) -> tuple:
+    today = date.fromordinal(today_ordinal)
+    return (today - timedelta(days=window_days)).isoformat(), today.isoformat()
+
+
+def _window_dates(window_days: int) -> tuple:
+    """
+    Returns (start, end) date strings for a window ending today.
+    
+    The strings only change at midnight, so they are computed once per day and
+    keep the observation cache keys stable in between.
+    """
+    return _window_dates_for(date.today().toordinal(), window_days)
+
+
+@lru_cache(maxsize=4096)
+def _tokens(text: str) -> frozenset:
+    """Lower-cased content words of a query or series title."""
+    return frozenset(t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS)
+
+def _get_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(base_url=FRED_API_URL, timeout=10, http2=True)
+        _clients[loop] = client
+    return client
+
+
+async def aclose_client() -> None:
+    """Closes the FRED HTTP client bound to the running event loop, if one was opened."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def _get_json(path: str, **params: Any) -> Dict[str, Any]:
+    """
+    Issues an authenticated GET against the FRED API and returns the JSON body.
+    
+    Args:
+        path: Endpoint path below FRED_API_URL (e.g. "/series/observations").
+        **params: Query parameters for the endpoint.
+        
+    Returns:
+        The decoded JSON response.
+    """
+    params.update(api_key=settings.FRED_API_KEY, file_type="json")
+    client = _get_client()
+    for attempt in range(MAX_RETRIES + 1):
+        response = await client.get(path, params=params)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            break
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+    
+    if response.is_error:
+        # FRED reports failures as {"error_code": ..., "error_message": ...}
+        try:
+            message = orjson.loads(response.content).get("error_message")
+        except (orjson.JSONDecodeError, AttributeError):
+            message = None
+        raise ValueError(message or f"FRED request to {path} failed with status {response.status_code}")
+    return orjson.loads(response.content)
+
+
+# Enhanced primary series mapping with aliases for common economic terms.
+# This mapping allows for instant retrieval without LLM overhead for 
+# standard queries. Built once at import and exposed read-only; keys are
+# interned so lookups with an interned query hit on pointer equality.
+PRIMARY_SERIES_MAP: Final[Mapping[str, str]] = MappingProxyType({sys.intern(k): v for k, v in {
+    # Inflation indicators
+    "inflation": "CPIAUCSL",
+    "cpi": "CPIAUCSL",
+    "consumer price index": "CPIAUCSL",
+    "core inflation": "CPILFESL",
+    "pce": "PCEPI",
+    "core pce": "PCEPILFE",
+    
+    # Employment indicators
+    "unemployment": "UNRATE",
+    "unemployment rate": "UNRATE",
+    "jobless rate": "UNRATE",
+    "employment": "PAYEMS",
+    "jobs": "PAYEMS",
+    "nonfarm payrolls": "PAYEMS",
+    
+    # Interest rates
+    "interest rate": "DFF",
+    "fed funds": "DFF",
+    "federal funds rate": "DFF",
+    "fed rate": "DFF",
+    "10 year treasury": "DGS10",
+    "10y treasury": "DGS10",
+    "30 year mortgage": "MORTGAGE30US",
+    
+    # GDP and growth
+    "gdp": "GDP",
+    "gross domestic product": "GDP",
+    "economic growth": "GDP",
+    "real gdp": "GDPC1",
+    
+    # Other key indicators
+    "housing starts": "HOUST",
+    "retail sales": "RSAFS",
+    "industrial production": "INDPRO",
+    "consumer confidence": "UMCSENT",
+    "durable goods": "DGORDER"
+}.items()})
+
+# Compile every keyword into one regex so a query is matched in a single
+# pass instead of one substring scan per keyword. The lookahead reports
+# a match at every start position (including overlapping ones), and the
+# longest-first alternation picks the longest keyword at each position.
+# Ties are broken by priority: longer keyword first, then map order.
+_KEYWORD_PRIORITY: Final[Mapping[str, tuple]] = MappingProxyType({
+    keyword: (-len(keyword), order)
+    for order, keyword in enumerate(PRIMARY_SERIES_MAP)
+})
+_KEYWORD_PATTERN: Final = re.compile(
+    "(?=(" + "|".join(
+        re.escape(keyword)
+        for keyword in sorted(PRIMARY_SERIES_MAP, key=_KEYWORD_PRIORITY.get)
+    ) + "))"
+)
+
+# Indicators that require year-over-year (YoY) calculations rather than
+# just the latest value.
+SPECIAL_SERIES: Final[frozenset] = frozenset({"CPIAUCSL", "CPILFESL", "PCEPI", "PCEPILFE"})
+
+
+# Module-level so the cache is keyed on the query alone, not the data-source instance.
+@lru_cache(maxsize=1024)
+def _find_primary_series(query_lower: str) -> Optional[str]:
+    """
+    Performs a keyword-based search in the PRIMARY_SERIES_MAP.
+    
+    Args:
+        query_lower: The user's query, lower-cased and stripped.
+        
+    Returns:
+        A FRED series ID if a match is found, else None.
+    """
+    # Direct exact matches first
+    if query_lower in PRIMARY_SERIES_MAP:
+        series_id = PRIMARY_SERIES_MAP[query_lower]
+        logger.debug("Direct match found: %r -> %s", query_lower, series_id)
+        return series_id
+    
+    # Partial keyword matches, preferring the most specific keyword
+    keyword = min(
+        (m.group(1) for m in _KEYWORD_PATTERN.finditer(query_lower)),
+        key=_KEYWORD_PRIORITY.get,
+        default=None,
+    )
+    if keyword is not None:
+        series_id = PRIMARY_SERIES_MAP[keyword]
+        logger.debug("Partial match found: %r in %r -> %s", keyword, query_lower, series_id)
+        return series_id
+            
+    return None
+
+
+class _SelectionBatcher:
+    """
+    Collects concurrent LLM series-selection prompts and sends them to Gemini
+    in batches.
+    
+    Prompts are queued with their caller's future; a background task drains
+    up to SELECTION_BATCH_SIZE of them (or whatever arrived within
+    SELECTION_BATCH_WAIT seconds), groups them by API key and issues one
+    `abatch` call per key.
+    """
+    
+    def __init__(self, source: "FREDDataSource"):
+        self._source = source
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # In-flight dispatches; the loop only keeps weak references to tasks.
+        self._dispatches: Set[asyncio.Task] = set()
+    
+    async def submit(self, google_api_key: str, inputs: Dict[str, str]) -> str:
+        """
+        Queues one chooser prompt and waits for the LLM's reply text.
+        """
+        loop = asyncio.get_running_loop()
+        # The queue and worker belong to one event loop; start them lazily.
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((google_api_key, inputs, future))
+        return await future
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + SELECTION_BATCH_WAIT
+            try:
+                while len(batch) < SELECTION_BATCH_SIZE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Prompts already taken off the queue would otherwise hang.
+                for _, _, future in batch:
+                    future.cancel()
+                raise
+            
+            groups: Dict[str, List] = {}
+            for google_api_key, inputs, future in batch:
+                groups.setdefault(google_api_key, []).append((inputs, future))
+            # Dispatch without waiting so the next batch can start filling.
+            for google_api_key, items in groups.items():
+                task = loop.create_task(self._dispatch(google_api_key, items))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+    
+    async def aclose(self) -> None:
+        """
+        Cancels the background worker and any in-flight dispatches. Prompts
+        still waiting on them are cancelled too.
+        """
+        tasks = list(self._dispatches)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, _, future = self._queue.get_nowait()
+                future.cancel()
+        self._loop = self._queue = self._worker = None
+    
+    async def _dispatch(self, google_api_key: str, items: List) -> None:
+        try:
+            chain = self._source.chooser_prompt | self._source._get_llm(google_api_key)
+            responses = await chain.abatch([inputs for inputs, _ in items], return_exceptions=True)
+        except asyncio.CancelledError:
+            for _, future in items:
+                future.cancel()
+            raise
+        except Exception as e:
+            responses = [e] * len(items)
+        for (_, future), response in zip(items, responses):
+            if future.done():
+                continue
+            if isinstance(response, Exception):
+                future.set_exception(response)
+            else:
+                future.set_result(response.content)
+
+
 class FREDDataSource:
     """
     Enhanced FRED data source with improved error handling, flexibility, and reliability.
@@ -37,68 +346,25 @@ class FREDDataSource:
     
     def __init__(self):
         """
-        Initializes the FRED API client using the system-level FRED API key.
+        Sets up the response caches and the LLM chooser prompt. FRED requests are
+        authenticated with the system-level FRED API key from the settings.
         The LLM is not initialized here as it requires a dynamic user key.
         """
-        # Initialize FRED API using the key from the server configuration
-        try:
-            self.fred = Fred(api_key=settings.FRED_API_KEY)
-            logger.info("FRED API initialized successfully using system settings.")
-        except Exception as e:
-            logger.error(f"Failed to initialize FRED API: {e}")
-            raise
-            
-        # Enhanced primary series mapping with aliases for common economic terms.
-        # This mapping allows for instant retrieval without LLM overhead for 
-        # standard queries.
-        self.PRIMARY_SERIES_MAP = {
-            # Inflation indicators
-            "inflation": "CPIAUCSL",
-            "cpi": "CPIAUCSL",
-            "consumer price index": "CPIAUCSL",
-            "core inflation": "CPILFESL",
-            "pce": "PCEPI",
-            "core pce": "PCEPILFE",
-            
-            # Employment indicators
-            "unemployment": "UNRATE",
-            "unemployment rate": "UNRATE",
-            "jobless rate": "UNRATE",
-            "employment": "PAYEMS",
-            "jobs": "PAYEMS",
-            "nonfarm payrolls": "PAYEMS",
-            
-            # Interest rates
-            "interest rate": "DFF",
-            "fed funds": "DFF",
-            "federal funds rate": "DFF",
-            "fed rate": "DFF",
-            "10 year treasury": "DGS10",
-            "10y treasury": "DGS10",
-            "30 year mortgage": "MORTGAGE30US",
-            
-            # GDP and growth
-            "gdp": "GDP",
-            "gross domestic product": "GDP",
-            "economic growth": "GDP",
-            "real gdp": "GDPC1",
-            
-            # Other key indicators
-            "housing starts": "HOUST",
-            "retail sales": "RSAFS",
-            "industrial production": "INDPRO",
-            "consumer confidence": "UMCSENT",
-            "durable goods": "DGORDER"
-        }
+        # Process-wide caches in front of the network calls. Most FRED series
+        # update at most daily, so repeat questions ("inflation", "gdp") are
+        # served from memory. Values are computed outside the lock; the lock
+        # only guards the (non thread-safe) TTLCache bookkeeping.
+        self._cache_lock = threading.RLock()
+        self._series_info_cache = TTLCache(maxsize=512, ttl=86400)
+        self._series_cache = TTLCache(maxsize=512, ttl=3600)
+        self._search_cache = TTLCache(maxsize=512, ttl=900)
+        self._answer_cache = TTLCache(maxsize=1024, ttl=900)
         
-        # Special handling configurations for indicators that require 
-        # year-over-year (YoY) calculations rather than just the latest value.
-        self.SPECIAL_CALCULATIONS = {
-            "CPIAUCSL": self._calculate_inflation_rate,
-            "CPILFESL": self._calculate_inflation_rate,
-            "PCEPI": self._calculate_inflation_rate,
-            "PCEPILFE": self._calculate_inflation_rate
-        }
+        # Gemini clients keyed by a digest of the user's API key (the raw key is
+        # never used as a dict key), so repeat users reuse an open client.
+        self._llm_lock = threading.Lock()
+        self._llm_cache = LRUCache(maxsize=64)
+        self._selection_batcher = _SelectionBatcher(self)
         
         # LLM chooser prompt used to select the best FRED series ID from 
         # a list of search results.
@@ -123,6 +389,29 @@ Return ONLY the series ID (e.g., UNRATE) with no explanation:"""
         )
 
     def get_economic_data(self, query: str, google_api_key: str, limit: int = 10) -> str:
+        """
+        Synchronous wrapper around `aget_economic_data` for legacy callers.
+        
+        Runs the query on a private event loop, so it must not be called from
+        a thread that already has a running loop.
+        
+        Args:
+            query: User's economic data request.
+            google_api_key: The user-provided Google Gemini API key.
+            limit: Maximum number of search results to consider if LLM is used.
+            
+        Returns:
+            Formatted string with economic data or an error message.
+        """
+        async def run() -> str:
+            try:
+                return await self.aget_economic_data(query, google_api_key, limit, batch=False)
+            finally:
+                await aclose_client()
+        
+        return asyncio.run(run())
+
+    async def aget_economic_data(self, query: str, google_api_key: str, limit: int = 10, batch: bool = True) -> str:
         """
         Main method to fetch economic data based on user query.
         
@@ -130,118 +419,206 @@ Return ONLY the series ID (e.g., UNRATE) with no explanation:"""
             query: User's economic data request.
             google_api_key: The user-provided Google Gemini API key.
             limit: Maximum number of search results to consider if LLM is used.
+            batch: Queue the LLM selection for batching with concurrent queries
+                (adds up to SELECTION_BATCH_WAIT seconds) or call Gemini directly.
             
         Returns:
             Formatted string with economic data or an error message.
         """
-        logger.info(f"Processing FRED query: '{query}'")
+        logger.info("Processing FRED query: %r", query)
+        # Normalize once; the same key drives keyword matching and the caches.
+        query_key = sys.intern(query.lower().strip())
         
         try:
             # Step 1: Check for direct keyword matches in the static map
             # This is the fastest path and avoids LLM usage.
-            series_id = self._find_primary_series(query)
+            series_id = _find_primary_series(query_key)
             
             # Step 2: If no direct match is found, use LLM-powered search.
-            # We pass the google_api_key to initialize the LLM locally.
+            # Resolved IDs are remembered per query, not per API key.
+            if not series_id:
+                with self._cache_lock:
+                    series_id = self._search_cache.get(query_key)
             if not series_id:
                 logger.info("No static match found. Proceeding to LLM-powered FRED search.")
-                series_id = self._llm_search_and_select(query, google_api_key, limit)
+                series_id = await self._a_llm_search_and_select(query, google_api_key, limit, batch)
+                if series_id:
+                    with self._cache_lock:
+                        self._search_cache[query_key] = series_id
             
             # Step 3: Fetch the data for the identified series and format it.
             if series_id:
-                return self._fetch_and_format_data(series_id, query)
+                return await self._aget_answer(query_key, series_id, query)
             else:
                 return f"Could not find relevant economic data for: '{query}'"
                 
         except Exception as e:
-            logger.error(f"Error processing FRED query '{query}': {e}")
+            logger.error("Error processing FRED query %r: %s", query, e)
             return f"An error occurred while fetching economic data: {str(e)}"
 
-    def _find_primary_series(self, query: str) -> Optional[str]:
+    async def _aget_answer(self, query_key: str, series_id: str, query: str) -> str:
         """
-        Performs a keyword-based search in the PRIMARY_SERIES_MAP.
+        Returns the formatted data for a resolved series, served from the
+        answer cache when possible.
         
         Args:
-            query: The user's query string.
+            query_key: The normalized user query.
+            series_id: The resolved FRED ID.
+            query: The user's original question.
             
         Returns:
-            A FRED series ID if a match is found, else None.
+            A formatted data string.
         """
-        query_lower = query.lower().strip()
-        
-        # Direct exact matches first
-        if query_lower in self.PRIMARY_SERIES_MAP:
-            series_id = self.PRIMARY_SERIES_MAP[query_lower]
-            logger.info(f"Direct match found: '{query_lower}' -> {series_id}")
-            return series_id
-        
-        # Partial keyword matches
-        for keyword, series_id in self.PRIMARY_SERIES_MAP.items():
-            if keyword in query_lower:
-                logger.info(f"Partial match found: '{keyword}' in '{query_lower}' -> {series_id}")
-                return series_id
-                
-        return None
+        answer_key = (query_key, series_id)
+        with self._cache_lock:
+            answer = self._answer_cache.get(answer_key)
+        if answer is None:
+            answer = await self._afetch_and_format_data(series_id, query)
+            if not answer.startswith("Error retrieving data"):
+                with self._cache_lock:
+                    self._answer_cache[answer_key] = answer
+        return answer
 
-    def _llm_search_and_select(self, query: str, google_api_key: str, limit: int) -> Optional[str]:
+    async def _a_llm_search_and_select(self, query: str, google_api_key: str, limit: int, batch: bool) -> Optional[str]:
         """
-        Uses a locally initialized LLM to search FRED and select the best series.
+        Searches FRED and selects the best series, locally when a title clearly
+        matches and otherwise with the user's LLM.
         
         Args:
             query: The user's query.
             google_api_key: User's API key for Gemini.
             limit: Search result limit.
+            batch: Route the LLM selection through the shared batcher.
             
         Returns:
             The selected series ID or None.
         """
-        if not google_api_key:
-            logger.warning("Google API Key missing. Skipping LLM-powered search.")
-            return None
-            
         try:
-            # Initialize the LLM locally for this specific request.
-            # This ensures we use the user's provided key.
-            llm = ChatGoogleGenerativeAI(
-                model="gemini-2.0-flash", 
-                google_api_key=google_api_key, 
-                temperature=0
-            )
-            
             # Perform a search using the FRED API
-            logger.info(f"Searching FRED API for: '{query}'")
-            search_results = self.fred.search(query, limit=limit)
+            logger.info("Searching FRED API for: %r", query)
+            search_results = await self._asearch(query, limit)
             
             if search_results is None or search_results.empty:
-                logger.warning(f"No FRED search results returned for: '{query}'")
+                logger.warning("No FRED search results returned for: %r", query)
                 return None
             
-            # Format the search results into a text block for the LLM
-            results_text = self._format_search_results(search_results)
+            # A clear title match needs no LLM call
+            series_id = self._select_locally(query, search_results)
+            if series_id:
+                return series_id
             
-            # Use the LLM to choose the best series from the results
-            logger.info("Invoking LLM to select the most relevant economic series.")
-            chain = self.chooser_prompt | llm
-            response = chain.invoke({
-                "query": query, 
-                "search_results": results_text
-            })
+            if not google_api_key:
+                logger.warning("Google API Key missing. Skipping LLM-powered selection.")
+                return None
             
-            chosen_id = response.content.strip()
+            inputs = {
+                "query": query, 
+                "search_results": self._format_search_results(search_results)
+            }
             
-            # Validate that the LLM's choice exists in our search results
-            if chosen_id in search_results['id'].values:
-                logger.info(f"LLM successfully selected series: {chosen_id}")
-                return chosen_id
+            # Use the LLM to choose the best series from the results
+            logger.info("Invoking LLM to select the most relevant economic series.")
+            if batch:
+                content = await self._selection_batcher.submit(google_api_key, inputs)
             else:
-                logger.warning(f"LLM selected an ID not in search results: {chosen_id}. Falling back to top result.")
-                # Fallback to the first (most relevant) result from FRED search
-                return search_results.iloc[0]['id']
+                response = await (self.chooser_prompt | self._get_llm(google_api_key)).ainvoke(inputs)
+                content = response.content
+            
+            return self._validate_choice(content.strip(), search_results)
                 
         except Exception as e:
-            logger.error(f"LLM-powered FRED search failed: {e}")
+            logger.error("LLM-powered FRED search failed: %s", e)
             return None
 
+    async def _asearch(self, query: str, limit: int) -> Optional[pd.DataFrame]:
+        """
+        Runs a FRED full-text series search.
+        
+        Args:
+            query: The search text.
+            limit: Maximum number of results.
+            
+        Returns:
+            A DataFrame with one row per series (id, title, units, ...), or None
+            if nothing matched.
+        """
+        data = await _get_json("/series/search", search_text=query, limit=limit)
+        seriess = data.get("seriess") or []
+        return pd.DataFrame(seriess) if seriess else None
+
+    def _select_locally(self, query: str, search_results: pd.DataFrame) -> Optional[str]:
+        """
+        Picks the search result whose title best matches the query, using
+        cosine similarity over content-word sets.
+        
+        Args:
+            query: The user's query.
+            search_results: DataFrame containing FRED search results.
+            
+        Returns:
+            The best matching series ID, or None if no title scores at least
+            LOCAL_MATCH_THRESHOLD.
+        """
+        query_tokens = _tokens(query)
+        if not query_tokens:
+            return None
+        
+        best_id, best_score = None, 0.0
+        for series_id, title in zip(search_results['id'], search_results['title']):
+            title_tokens = _tokens(str(title))
+            if not title_tokens:
+                continue
+            score = len(query_tokens & title_tokens) / math.sqrt(len(query_tokens) * len(title_tokens))
+            if score > best_score:
+                best_id, best_score = series_id, score
+        
+        if best_score >= LOCAL_MATCH_THRESHOLD:
+            logger.info("Local title match selected series: %s (score %.2f)", best_id, best_score)
+            return best_id
+        return None
+
+    def _validate_choice(self, chosen_id: str, search_results: pd.DataFrame) -> str:
+        """
+        Checks the LLM's choice against the search results.
+        
+        Args:
+            chosen_id: The series ID returned by the LLM.
+            search_results: DataFrame containing FRED search results.
+            
+        Returns:
+            The chosen ID, or the top search result if the choice is not listed.
+        """
+        # Validate that the LLM's choice exists in our search results
+        if chosen_id in search_results['id'].values:
+            logger.info("LLM successfully selected series: %s", chosen_id)
+            return chosen_id
+        else:
+            logger.warning("LLM selected an ID not in search results: %s. Falling back to top result.", chosen_id)
+            # Fallback to the first (most relevant) result from FRED search
+            return search_results.iloc[0]['id']
+
+    def _get_llm(self, google_api_key: str) -> ChatGoogleGenerativeAI:
+        """
+        Returns the cached Gemini client for an API key, creating it on a miss.
+        
+        Args:
+            google_api_key: User's API key for Gemini.
+            
+        Returns:
+            A ChatGoogleGenerativeAI client bound to that key.
+        """
+        key = hashlib.blake2b(google_api_key.encode(), digest_size=16).hexdigest()
+        with self._llm_lock:
+            llm = self._llm_cache.get(key)
+            if llm is None:
+                llm = ChatGoogleGenerativeAI(
+                    model="gemini-2.0-flash", 
+                    google_api_key=google_api_key, 
+                    temperature=0
+                )
+                self._llm_cache[key] = llm
+        return llm
+
     def _format_search_results(self, search_results: pd.DataFrame) -> str:
         """
         Formats search results into a readable string for LLM processing.
@@ -252,14 +629,16 @@ Return ONLY the series ID (e.g., UNRATE) with no explanation:"""
         Returns:
             A formatted string of IDs and Titles.
         """
-        formatted_results = []
-        for _, row in search_results.iterrows():
-            formatted_results.append(
-                f"ID: {row['id']} | Title: {row['title']} | Units: {row.get('units', 'N/A')}"
-            )
-        return "\n".join(formatted_results)
+        # Build every line with pandas string ops instead of boxing each row via iterrows
+        units = search_results['units'].fillna('N/A') if 'units' in search_results else 'N/A'
+        lines = (
+            'ID: ' + search_results['id'].astype(str)
+            + ' | Title: ' + search_results['title'].astype(str)
+            + ' | Units: ' + (units.astype(str) if isinstance(units, pd.Series) else units)
+        )
+        return lines.str.cat(sep='\n')
 
-    def _fetch_and_format_data(self, series_id: str, original_query: str) -> str:
+    async def _afetch_and_format_data(self, series_id: str, original_query: str) -> str:
         """
         Fetches the numerical data for a series and applies formatting.
         
@@ -271,23 +650,30 @@ Return ONLY the series ID (e.g., UNRATE) with no explanation:"""
             A formatted data string.
         """
         try:
-            logger.info(f"Fetching data for series: {series_id}")
-            
-            # Retrieve metadata for the series
-            series_info = self._get_series_info(series_id)
+            logger.info("Fetching data for series: %s", series_id)
             
             # Check if this series requires a special calculation (like YoY Inflation)
-            if series_id in self.SPECIAL_CALCULATIONS:
-                return self.SPECIAL_CALCULATIONS[series_id](series_id, series_info, original_query)
+            special_calculation = series_id in SPECIAL_SERIES
+            
+            # Retrieve metadata and observations concurrently
+            info_task = asyncio.create_task(self._afetch_series_info(series_id))
+            if special_calculation:
+                data_task = asyncio.create_task(self._afetch_series_window(series_id, INFLATION_WINDOW_DAYS))
             else:
-                # Otherwise, perform a standard data fetch
-                return self._standard_data_fetch(series_id, series_info)
+                data_task = asyncio.create_task(self._afetch_latest_observations(series_id))
+            series_info, data = await asyncio.gather(info_task, data_task)
+            
+            if special_calculation:
+                return self._calculate_inflation_rate(series_id, series_info, original_query, data)
+            else:
+                # Otherwise, format the latest value and recent change
+                return self._standard_data_fetch(series_id, series_info, data)
                 
         except Exception as e:
-            logger.error(f"Failed to fetch or format data for {series_id}: {e}")
+            logger.error("Failed to fetch or format data for %s: %s", series_id, e)
             return f"Error retrieving data for series {series_id}: {str(e)}"
 
-    def _get_series_info(self, series_id: str) -> Dict[str, Any]:
+    async def _afetch_series_info(self, series_id: str) -> Dict[str, Any]:
         """
         Fetches metadata for a specific series ID.
         
@@ -297,45 +683,115 @@ Return ONLY the series ID (e.g., UNRATE) with no explanation:"""
         Returns:
             A dictionary of series metadata.
         """
+        async def fetch() -> Dict[str, Any]:
+            data = await _get_json("/series", series_id=series_id)
+            return data["seriess"][0]
+        
         try:
-            return self.fred.get_series_info(series_id)
+            return await self._acached(self._series_info_cache, series_id, fetch)
         except Exception as e:
-            logger.warning(f"Could not retrieve metadata for {series_id}: {e}")
+            logger.warning("Could not retrieve metadata for %s: %s", series_id, e)
             return {"title": series_id, "units": "Unknown", "units_short": ""}
 
-    def _standard_data_fetch(self, series_id: str, series_info: Dict[str, Any]) -> str:
+    async def _acached(self, cache: TTLCache, key: Any, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns `cache[key]`, computing and storing it on a miss.
+        
+        Args:
+            cache: One of the instance's TTL caches.
+            key: The cache key.
+            compute: Zero-argument coroutine function producing the value;
+                exceptions propagate and nothing is cached.
+            
+        Returns:
+            The cached or freshly computed value.
+        """
+        with self._cache_lock:
+            if key in cache:
+                return cache[key]
+        value = await compute()
+        with self._cache_lock:
+            cache[key] = value
+        return value
+
+    async def _afetch_series_window(self, series_id: str, days: int) -> List[tuple]:
+        """
+        Fetches the observations for a series over the last `days` days.
+        
+        Args:
+            series_id: The FRED ID.
+            days: Size of the observation window, ending today.
+            
+        Returns:
+            (date, raw value string) tuples, oldest first. Values are left as
+            strings; callers convert only the rows they use.
+        """
+        start, end = _window_dates(days)
+        
+        async def fetch() -> List[tuple]:
+            data = await _get_json(
+                "/series/observations",
+                series_id=series_id,
+                observation_start=start,
+                observation_end=end,
+            )
+            return [
+                (obs["date"], obs["value"])
+                for obs in data.get("observations", [])
+                if obs.get("value") not in (None, ".")
+            ]
+        
+        return await self._acached(self._series_cache, (series_id, start, end), fetch)
+
+    async def _afetch_latest_observations(self, series_id: str) -> List[tuple]:
         """
-        Performs a standard data fetch for the latest value and recent change.
+        Fetches the two most recent observations of a series as plain values.
+        
+        Args:
+            series_id: The FRED ID.
+            
+        Returns:
+            Up to two (date, value) tuples, newest first.
+        """
+        async def fetch() -> List[tuple]:
+            data = await _get_json(
+                "/series/observations",
+                series_id=series_id,
+                sort_order="desc",
+                limit=LATEST_OBSERVATIONS_LIMIT,
+            )
+            observations = [
+                (obs["date"], float(obs["value"]))
+                for obs in data.get("observations", [])
+                if obs.get("value") not in (None, ".")
+            ]
+            return observations[:2]
+        
+        return await self._acached(self._series_cache, (series_id, "latest"), fetch)
+
+    def _standard_data_fetch(self, series_id: str, series_info: Dict[str, Any], observations: List[tuple]) -> str:
+        """
+        Formats the latest value and recent change of a standard series.
         
         Args:
             series_id: The FRED ID.
             series_info: Metadata dictionary.
+            observations: Up to two (date, value) tuples, newest first.
             
         Returns:
             A formatted string with the latest economic data.
         """
         try:
-            # Retrieve the last 2 years of data to provide context and calculate change
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=730)
-            
-            data = self.fred.get_series(
-                series_id, 
-                observation_start=start_date.strftime('%Y-%m-%d'),
-                observation_end=end_date.strftime('%Y-%m-%d')
-            )
-            
-            if data.empty:
+            if not observations:
                 return f"No recent data points available for series {series_id}."
             
             # Extract the most recent value and its date
-            latest_value = data.iloc[-1]
-            latest_date = data.index[-1].strftime('%Y-%m-%d')
+            latest_date, latest_value = observations[0]
             
             # Calculate the change from the previous observation if available
             change_info = ""
-            if len(data) >= 2:
-                previous_value = data.iloc[-2]
+            if len(observations) >= 2:
+                previous_value = observations[1][1]
                 change = latest_value - previous_value
                 change_pct = (change / previous_value) * 100 if previous_value != 0 else 0
                 change_info = f"\n- Change from previous: {change:+,.2f} ({change_pct:+.2f}%)"
@@ -352,10 +808,10 @@ Return ONLY the series ID (e.g., UNRATE) with no explanation:"""
             )
             
         except Exception as e:
-            logger.error(f"Standard data fetch failed for {series_id}: {e}")
+            logger.error("Standard data fetch failed for %s: %s", series_id, e)
             raise Exception(f"Standard fetch failed for {series_id}: {e}")
 
-    def _calculate_inflation_rate(self, series_id: str, series_info: Dict[str, Any], original_query: str) -> str:
+    def _calculate_inflation_rate(self, series_id: str, series_info: Dict[str, Any], original_query: str, data: List[tuple]) -> str:
         """
         Calculates the Year-over-Year (YoY) inflation rate for price indices.
         
@@ -363,30 +819,23 @@ Return ONLY the series ID (e.g., UNRATE) with no explanation:"""
             series_id: The FRED ID (e.g., CPIAUCSL).
             series_info: Metadata dictionary.
             original_query: The user's query.
+            data: (date, value) observations covering at least the last 13 months,
+                oldest first.
             
         Returns:
             A formatted string showing the calculated inflation rate.
         """
         try:
             # We need at least 13 months of data to calculate a 12-month YoY change
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=450)
-            
-            data = self.fred.get_series(
-                series_id,
-                observation_start=start_date.strftime('%Y-%m-%d'),
-                observation_end=end_date.strftime('%Y-%m-%d')
-            )
-            
             if len(data) < 13:
                 return f"Insufficient data for inflation calculation (need 13+ observations, found {len(data)})."
             
             # Calculate YoY inflation: ((Current / YearAgo) - 1) * 100
-            latest_value = data.iloc[-1]
-            year_ago_value = data.iloc[-13]
+            latest_date, latest_value = data[-1]
+            latest_value = float(latest_value)
+            year_ago_value = float(data[-13][1])
             
             inflation_rate = ((latest_value - year_ago_value) / year_ago_value) * 100
-            latest_date = data.index[-1].strftime('%Y-%m-%d')
             
             title = series_info.get('title', 'Consumer Price Index')
             
@@ -399,7 +848,7 @@ Return ONLY the series ID (e.g., UNRATE) with no explanation:"""
             )
             
         except Exception as e:
-            logger.error(f"Inflation calculation failed for {series_id}: {e}")
+            logger.error("Inflation calculation failed for %s: %s", series_id, e)
             raise Exception(f"Inflation calculation failed for {series_id}: {e}")
 
 
@@ -407,17 +856,35 @@ Return ONLY the series ID (e.g., UNRATE) with no explanation:"""
 # This instance is shared across the application.
 fred_data_source = FREDDataSource()
 
-def get_economic_data(query: str, google_api_key: str) -> str:
+def get_economic_data(query: str, api_key: str) -> str:
     """
     Public interface function for the LangGraph workflow.
     
     Args:
         query: The user's economic data request.
-        google_api_key: The user-provided Google Gemini API key.
+        api_key: The user-provided Google Gemini API key.
         
     Returns:
         A formatted string containing the requested economic data.
     """
     # Delegate the request to the global FREDDataSource instance.
-    return fred_data_source.get_economic_data(query, google_api_key)
+    return fred_data_source.get_economic_data(query, api_key)
 
+
+async def aclose_selection_batcher() -> None:
+    """Stops the shared LLM selection batcher's background tasks."""
+    await fred_data_source._selection_batcher.aclose()
+
+
+async def aget_economic_data(query: str, api_key: str) -> str:
+    """
+    Async public interface function for the LangGraph workflow.
+    
+    Args:
+        query: The user's economic data request.
+        api_key: The user-provided Google Gemini API key.
+        
+    Returns:
+        A formatted string containing the requested economic data.
+    """
+    return await fred_data_source.aget_economic_data(query, api_key)
@@ -1,70 +1,167 @@
 # backend/core/data_sources/newsapi.py
 
-from newsapi import NewsApiClient
+import asyncio
+import io
+import logging
+import httpx
+import msgspec
 from backend.config import settings
 from .yahoo_finance import extract_financial_entities
 
-newsapi = NewsApiClient(api_key=settings.NEWS_API_KEY)
+log = logging.getLogger(__name__)
 
-def get_financial_news(query: str, api_key: str) -> str:
-    """
-    Fetches news from NewsAPI. It uses the central AI extractor to find tickers,
-    and if none are found, it falls back to the original query.
-    """
-    entities = extract_financial_entities(query, api_key)
+NEWSAPI_URL = "https://newsapi.org/v2/everything"
+
+# Shared async client so the per-term requests of a query (and concurrent
+# queries) reuse pooled connections to NewsAPI. Created lazily and closed by
+# the API's shutdown hook via `aclose_client()`.
+_client: httpx.AsyncClient | None = None
+
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=10,
+        headers={"X-Api-Key": settings.NEWS_API_KEY},
+        limits=httpx.Limits(max_connections=16),
+    )
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _new_client()
+    return _client
+
+
+async def aclose_client() -> None:
+    """Closes the shared NewsAPI HTTP client, if one was opened."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class _Source(msgspec.Struct):
+    name: str | None = None
+
+
+class _Article(msgspec.Struct):
+    """The article fields we print; NewsAPI sends null for missing ones."""
+    title: str | None = None
+    source: _Source | None = None
+    publishedAt: str | None = None
+    description: str | None = None
+
+
+class _Everything(msgspec.Struct):
+    """The subset of the `everything` payload we read; other fields are skipped."""
+    status: str = ""
+    message: str | None = None
+    articles: list[_Article] = []
+
+
+_payload_decoder = msgspec.json.Decoder(_Everything)
+
+
+async def _fetch_term(client: httpx.AsyncClient, term: str) -> str:
+    q_param = f'"{term}"' if len(term) <= 5 else term
+
+    response = await client.get(
+        NEWSAPI_URL,
+        params={
+            "q": q_param,
+            "language": "en",
+            "sortBy": "relevancy",
+            "pageSize": 3,
+        },
+    )
+    top_headlines = _payload_decoder.decode(response.content)
+    if top_headlines.status != "ok":
+        raise RuntimeError(top_headlines.message or f"HTTP {response.status_code}")
+
+    articles = top_headlines.articles
+    if not articles:
+        return f"No recent news found for '{term}' via NewsAPI."
+
+    # Header, articles and separators go into one buffer, one write per field.
+    buf = io.StringIO()
+    buf.write(f"Top news related to '{term}':\n")
+    separator = ""
+    for article in articles:
+        published_at = article.publishedAt or 'Unknown date'
+
+        # Format date safely
+        if published_at and published_at != 'Unknown date':
+            try:
+                published_at = published_at[:10]
+            except:
+                published_at = 'Unknown date'
+
+        buf.write(separator)
+        buf.write("Title: ")
+        buf.write(article.title or 'No title available')
+        buf.write("\nSource: ")
+        buf.write((article.source and article.source.name) or 'Unknown source')
+        buf.write("\nPublished: ")
+        buf.write(published_at)
+        buf.write("\nSummary: ")
+        buf.write((article.description or 'No description available')[:200])
+        buf.write("...")
+        separator = "\n---\n"
+
+    return buf.getvalue()
+
+
+async def _gather_news(client: httpx.AsyncClient, search_terms: list[str]) -> str:
+    # One request per term, all in flight at once.
+    results = await asyncio.gather(
+        *(_fetch_term(client, term) for term in search_terms),
+        return_exceptions=True,
+    )
+
+    all_news_summaries = []
+    for term, result in zip(search_terms, results):
+        if isinstance(result, Exception):
+            log.warning("Failed to fetch news for '%s': %s", term, result)
+            all_news_summaries.append(f"An error occurred with NewsAPI for query '{term}': {result}")
+        else:
+            all_news_summaries.append(result)
+
+    return "\n\n=====\n\n".join(all_news_summaries) if all_news_summaries else "No news data could be retrieved."
+
+
+def _search_terms(query: str, entities: dict) -> list[str]:
     search_terms = entities.get("tickers", [])
-    
+
     if not search_terms:
-        search_terms = [query]
-        print(f"[NewsAPI] No specific tickers found. Searching for general query: '{query}'")
-    else:
-        print(f"[NewsAPI] Identified tickers for news search: {search_terms}")
-        
-    all_news_summaries = []
-    for term in search_terms:
-        try:
-            q_param = f'"{term}"' if len(term) <= 5 else term
-            
-            top_headlines = newsapi.get_everything(
-                q=q_param,
-                language='en',
-                sort_by='relevancy',
-                page_size=3
-            )
-
-            articles = top_headlines.get('articles', [])
-            if not articles:
-                all_news_summaries.append(f"No recent news found for '{term}' via NewsAPI.")
-                continue
-
-            term_header = f"Top news related to '{term}':\n"
-            
-            article_details = []
-            for article in articles:
-                # Add safe extraction with fallbacks
-                title = article.get('title', 'No title available')
-                source_name = article.get('source', {}).get('name', 'Unknown source')
-                published_at = article.get('publishedAt', 'Unknown date')
-                description = article.get('description', 'No description available')
-                
-                # Format date safely
-                if published_at and published_at != 'Unknown date':
-                    try:
-                        published_at = published_at[:10]
-                    except:
-                        published_at = 'Unknown date'
-                
-                article_details.append(
-                    f"Title: {title}\n"
-                    f"Source: {source_name}\n"
-                    f"Published: {published_at}\n"
-                    f"Summary: {description[:200]}..."
-                )
-
-            all_news_summaries.append(term_header + "\n---\n".join(article_details))
-
-        except Exception as e:
-            print(f"[NewsAPI Error] Failed to fetch news for '{term}': {e}")
-            all_news_summaries.append(f"An error occurred with NewsAPI for query '{term}': {e}")
-            
-    return "\n\n=====\n\n".join(all_news_summaries) if all_news_summaries else "No news data could be retrieved."
\ No newline at end of file
+        log.info("No specific tickers found. Searching for general query: '%s'", query)
+        return [query]
+    log.info("Identified tickers for news search: %s", search_terms)
+    return search_terms
+
+
+async def aget_financial_news(query: str, api_key: str, entities: dict | None = None) -> str:
+    """
+    Fetches news from NewsAPI. It uses the central AI extractor to find tickers
+    (or the `entities` already extracted by the workflow), and if none are found,
+    it falls back to the original query. All tickers are fetched concurrently.
+    """
+    if entities is None:
+        entities = await asyncio.to_thread(extract_financial_entities, query, api_key)
+    return await _gather_news(_get_client(), _search_terms(query, entities))
+
+
+def get_financial_news(query: str, api_key: str, entities: dict | None = None) -> str:
+    """
+    Synchronous wrapper around `aget_financial_news` for callers outside an
+    event loop. Uses its own short-lived client.
+    """
+    if entities is None:
+        entities = extract_financial_entities(query, api_key)
+    search_terms = _search_terms(query, entities)
+
+    async def run() -> str:
+        async with _new_client() as client:
+            return await _gather_news(client, search_terms)
+
+    return asyncio.run(run())
@@ -1,14 +1,22 @@
 from backend.config import settings
 from backend.core.data_sources.yahoo_finance import extract_financial_entities
-import pandas as pd
+from backend.core.data_sources.cache import FileCache
+from backend.core.data_sources import ta_fast
+from backend.core.data_sources._http import tune
 import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import attrgetter
 from typing import Optional
+import logging
+import math
 import re
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.runnables import RunnableLambda
 from pydantic import BaseModel, Field
 
 try:
@@ -17,11 +25,23 @@ except (ImportError, AttributeError):
     import polygon
     RESTClient = polygon.RESTClient
 
+log = logging.getLogger(__name__)
+
 class IndicatorRequest(BaseModel):
     indicator_name: str = Field(description="The name of the indicator, e.g., 'sma', 'ema', 'rsi', 'macd'.")
     window: Optional[int] = Field(default=None, description="The time window or period for the indicator.")
 
-polygon_client = RESTClient(api_key=settings.POLYGON_API_KEY)
+polygon_client = RESTClient(api_key=settings.POLYGON_API_KEY, num_pools=50)
+tune(polygon_client.client)
+
+# Daily bars never change once the session has closed, so completed days are
+# cached on disk for a week; only today's (still forming) bar is refetched.
+bars_cache = FileCache("polygon")
+HISTORICAL_BARS_TTL = 7 * 24 * 3600
+TODAY_BAR_TTL = 60
+SNAPSHOT_TTL = 60
+# Upper bound on tickers fetched concurrently for one query.
+MAX_TICKER_WORKERS = 10
 # llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", google_api_key=settings.GOOGLE_API_KEY, temperature=0)
 
 parser = JsonOutputParser(pydantic_object=IndicatorRequest)
@@ -39,168 +59,280 @@ indicator_prompt = ChatPromptTemplate.from_template(
 ).partial(format_instructions=parser.get_format_instructions())
 
 
-def extract_ticker_fallback(query: str, api_key: str) -> Optional[str]:
-    ticker_map = {
-        'apple': 'AAPL', 'microsoft': 'MSFT', 'google': 'GOOGL', 
-        'alphabet': 'GOOGL', 'amazon': 'AMZN', 'tesla': 'TSLA',
-        'meta': 'META', 'facebook': 'META', 'nvidia': 'NVDA',
-        'netflix': 'NFLX', 'amd': 'AMD', 'intel': 'INTC'
-    }
-    
-    query_lower = query.lower()
-    for key, ticker in ticker_map.items():
-        if key in query_lower:
+# Fast path for the indicator parser: most queries name the indicator
+# outright, so the LLM is only needed when none of these keywords appear.
+# Longer phrases come first so "moving average convergence" is not read as an SMA.
+_IND_RE = re.compile(
+    r'\b(moving average convergence|simple moving|moving average|sma|ema|exponential'
+    r'|rsi|relative strength|overbought|oversold|macd)\b',
+    re.I,
+)
+_WIN_RE = re.compile(r'\b(\d{1,3})[- ]?(day|period|bar)?\b', re.I)
+_DIGITS_RE = re.compile(r'\d+')
+_INDICATOR_ALIASES = {
+    'sma': 'sma', 'simple moving': 'sma', 'moving average': 'sma',
+    'ema': 'ema', 'exponential': 'ema',
+    'rsi': 'rsi', 'relative strength': 'rsi', 'overbought': 'rsi', 'oversold': 'rsi',
+    'macd': 'macd', 'moving average convergence': 'macd',
+}
+# When several keywords match ("exponential moving average"), the more specific wins.
+_INDICATOR_PRIORITY = ('macd', 'rsi', 'ema', 'sma')
+_DEFAULT_WINDOWS = {'sma': 50, 'ema': 50, 'rsi': 14, 'macd': None}
+
+
+# History is sized to the indicator: the window itself, plus warm-up for the
+# recursive ones (EMA/RSI/MACD are seeded from the first bar fetched).
+MIN_TRADING_DAYS = 40
+CALENDAR_DAYS_PER_TRADING_DAY = 1.6  # weekends and holidays
+
+
+def _history_days(indicator_name: str, window: Optional[int]) -> int:
+    needed = {
+        'sma': lambda w: w,
+        'ema': lambda w: w * 3,
+        'rsi': lambda w: max(w * 4, 50),
+        'macd': lambda w: 26 * 4 + 9,
+    }.get(indicator_name)
+    trading_days = needed(window or 0) if needed else 250
+    return int(max(trading_days, MIN_TRADING_DAYS) * CALENDAR_DAYS_PER_TRADING_DAY)
+
+
+def _fast_parse_indicator(query: str) -> Optional[dict]:
+    matched = {_INDICATOR_ALIASES[m.lower()] for m in _IND_RE.findall(query)}
+    if not matched:
+        return None
+    indicator_name = next(name for name in _INDICATOR_PRIORITY if name in matched)
+    window = _DEFAULT_WINDOWS[indicator_name]
+    if indicator_name != 'macd':
+        window_match = _WIN_RE.search(query)
+        if window_match:
+            window = int(window_match.group(1))
+    return {'indicator_name': indicator_name, 'window': window}
+
+
+_TICKER_MAP = {
+    'apple': 'AAPL', 'microsoft': 'MSFT', 'google': 'GOOGL', 
+    'alphabet': 'GOOGL', 'amazon': 'AMZN', 'tesla': 'TSLA',
+    'meta': 'META', 'facebook': 'META', 'nvidia': 'NVDA',
+    'netflix': 'NFLX', 'amd': 'AMD', 'intel': 'INTC'
+}
+_WORD_RE = re.compile(r'[a-z]+')
+_TICKER_RE = re.compile(r'\b([A-Z]{1,5})\b')
+
+def extract_ticker_fallback(query: str) -> Optional[str]:
+    # One pass over the query's words; the first known company name wins.
+    for word in _WORD_RE.findall(query.lower()):
+        ticker = _TICKER_MAP.get(word)
+        if ticker:
             return ticker
     
-    matches = re.findall(r'\b([A-Z]{1,5})\b', query)
-    return matches[0] if matches else None
-
-def calculate_sma(data, window):
-    return data.rolling(window=window).mean()
-
-def calculate_ema(data, window):
-    return data.ewm(span=window, adjust=False).mean()
-
-def calculate_rsi(data, window=14):
-    delta = data.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss.replace(0, np.nan)
-    return 100 - (100 / (1 + rs))
-
-def calculate_macd(data, fast=12, slow=26, signal=9):
-    ema_fast = data.ewm(span=fast, adjust=False).mean()
-    ema_slow = data.ewm(span=slow, adjust=False).mean()
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-    histogram = macd_line - signal_line
-    return macd_line, signal_line, histogram
-
-def get_technical_indicators(query: str, api_key: str) -> str:
-    ticker = None
+    # Otherwise the first upper-case token that is not an indicator name ("RSI for TSLA").
+    for symbol in _TICKER_RE.findall(query):
+        if symbol.lower() not in _INDICATOR_ALIASES:
+            return symbol
+    return None
+
+BAR_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+_bar_fields = attrgetter(*BAR_FIELDS)
+# Set once the (debug-only) bar ordering check has run.
+_bar_order_checked = False
+
+def fetch_daily_bars(ticker: str, from_date: str, to_date: str, ttl_seconds: float) -> dict[str, list]:
+    """
+    Returns daily OHLCV bars for [from_date, to_date] as one list per field of
+    `BAR_FIELDS`, oldest first, served from the file cache when an entry
+    younger than `ttl_seconds` exists.
+    """
+    key = f"{ticker}|1|day|{from_date}|{to_date}|columns"
+    bars = bars_cache.get(key, ttl_seconds)
+    if bars is not None:
+        return bars
+
+    agg_bars = polygon_client.get_aggs(
+        ticker=ticker,
+        multiplier=1,
+        timespan="day",
+        from_=from_date,
+        to=to_date,
+        sort="asc"
+    )
+    # attrgetter pulls all six fields of a bar in one C call and zip transposes
+    # the stream into columns, without materialising a list of row tuples.
+    columns = tuple(zip(*map(_bar_fields, agg_bars or ()))) or ((),) * len(BAR_FIELDS)
+    bars = {field: list(values) for field, values in zip(BAR_FIELDS, columns)}
+    # An empty range (new listing, data gap) is refetched rather than pinned for the TTL.
+    if bars["close"]:
+        bars_cache.set(key, bars)
+    return bars
+
+def concat_bars(*parts: dict[str, list]) -> dict[str, list]:
+    """Joins consecutive `fetch_daily_bars` results field by field."""
+    return {field: [value for part in parts for value in part[field]] for field in BAR_FIELDS}
+
+def fetch_current_prices(tickers: list[str]) -> dict[str, float]:
+    """
+    Returns the latest trade price of every ticker from one snapshot request,
+    cached for `SNAPSHOT_TTL`. Tickers missing from the snapshot are omitted;
+    an empty dict means the snapshot was unavailable.
+    """
+    key = "snapshot|" + ",".join(sorted(tickers))
+    prices = bars_cache.get(key, SNAPSHOT_TTL)
+    if prices is not None:
+        return prices
+
+    try:
+        snapshots = polygon_client.get_snapshot_all("stocks", tickers=tickers)
+    except Exception as e:
+        log.warning("Snapshot request failed, using the latest bar close: %s", e)
+        return {}
+
+    prices = {}
+    for snapshot in snapshots or []:
+        trade, day, prev_day = snapshot.last_trade, snapshot.day, snapshot.prev_day
+        price = (trade and trade.price) or (day and day.close) or (prev_day and prev_day.close)
+        if snapshot.ticker and price:
+            prices[snapshot.ticker] = price
+    if prices:
+        bars_cache.set(key, prices)
+    return prices
+
+def _keyword_indicator_request(query: str) -> dict:
+    """Keyword-only parse, used when the LLM fails: SMA with the first number (or 50) by default."""
+    request = _fast_parse_indicator(query)
+    if request is None:
+        numbers = _DIGITS_RE.findall(query)
+        request = {'indicator_name': 'sma', 'window': int(numbers[0]) if numbers else 50}
+    return request
+
+_keyword_fallback = RunnableLambda(lambda inputs: _keyword_indicator_request(inputs["query"]))
+
+@lru_cache(maxsize=8)
+def _indicator_chain(api_key: str):
+    # Built once per user key. A transient Gemini error is retried once, then
+    # the keyword parse takes over instead of failing the whole tool call.
     llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", api_key=api_key)
+    return (indicator_prompt | llm | parser).with_retry(
+        stop_after_attempt=2, wait_exponential_jitter=True
+    ).with_fallbacks([_keyword_fallback])
+
+def _parse_indicator_request(query: str, api_key: str) -> tuple[str, Optional[int]]:
     try:
-        ticker_info = extract_financial_entities(query, api_key)
-        if ticker_info and ticker_info.get('tickers'):
-            ticker = ticker_info['tickers'][0]
+        request = _fast_parse_indicator(query)
+        if request is None:
+            request = _indicator_chain(api_key).invoke({"query": query})
+        indicator_name = request.get('indicator_name', 'sma')
+        window = request.get('window')
     except Exception as e:
-        print(f"[Polygon.io] LLM extraction failed: {e}")
+        log.warning("LLM parsing failed: %s", e)
+        request = _keyword_indicator_request(query)
+        indicator_name, window = request['indicator_name'], request['window']
+
+    log.info("indicator='%s', window=%s", indicator_name, window)
+
+    if window is None:
+        window = _DEFAULT_WINDOWS.get(indicator_name)
+    return indicator_name, window
+
+def _fmt_ma(close: np.ndarray, window: int, label: str, name: str, ticker: str, current_price: float, fn) -> str:
+    latest_value = fn(close, window)
     
-    if not ticker:
-        ticker = extract_ticker_fallback(query)
-        if not ticker:
-            return "Could not identify a stock ticker. Please specify a company name or ticker symbol."
+    if math.isnan(latest_value):
+        return f"Not enough data to calculate {window}-day {label} for {ticker}."
     
-    print(f"[Polygon.io] Using ticker: {ticker}")
+    return f"Polygon.io Data for {ticker}:\n- Current Price: ${current_price:.2f}\n- {name} ({window}-day): ${latest_value:.2f}"
 
-    try:
-        try:
-            
-            indicator_chain = indicator_prompt | llm | parser
-            request = indicator_chain.invoke({"query": query})
-            indicator_name = request.get('indicator_name', 'sma')
-            window = request.get('window')
-        except Exception as e:
-            print(f"[Polygon.io] LLM parsing failed: {e}")
-            query_lower = query.lower()
-            if 'rsi' in query_lower:
-                indicator_name, window = 'rsi', 14
-            elif 'macd' in query_lower:
-                indicator_name, window = 'macd', None
-            elif 'ema' in query_lower or 'exponential' in query_lower:
-                indicator_name = 'ema'
-                numbers = re.findall(r'\d+', query)
-                window = int(numbers[0]) if numbers else 50
-            else:
-                indicator_name = 'sma'
-                numbers = re.findall(r'\d+', query)
-                window = int(numbers[0]) if numbers else 50
-
-        print(f"[Polygon.io] indicator='{indicator_name}', window={window}")
+def _fmt_rsi(close: np.ndarray, window: int, ticker: str, current_price: float) -> str:
+    latest_value = ta_fast.rsi_last(close, window)
+    
+    if math.isnan(latest_value):
+        return f"Not enough data to calculate {window}-day RSI for {ticker}."
+    
+    rsi_signal = "Overbought" if latest_value > 70 else "Oversold" if latest_value < 30 else "Neutral"
+    return f"Polygon.io Data for {ticker}:\n- Current Price: ${current_price:.2f}\n- RSI ({window}-day): {latest_value:.2f} ({rsi_signal})"
 
+def _fmt_macd(close: np.ndarray, ticker: str, current_price: float) -> str:
+    latest_macd, latest_signal, latest_hist = ta_fast.macd_last(close)
+    
+    if math.isnan(latest_macd) or math.isnan(latest_signal):
+        return f"Not enough data to calculate MACD for {ticker}."
+    
+    macd_signal = "Bullish" if latest_macd > latest_signal else "Bearish"
+    return f"Polygon.io Data for {ticker}:\n- Current Price: ${current_price:.2f}\n- MACD: {latest_macd:.4f}\n- Signal Line: {latest_signal:.4f}\n- Histogram: {latest_hist:.4f}\n- Signal: {macd_signal}"
+
+# indicator name -> handler(close, window, ticker, current_price) returning the summary
+_INDICATOR_HANDLERS = {
+    'sma': lambda c, w, t, p: _fmt_ma(c, w or 50, 'SMA', 'Simple Moving Average', t, p, ta_fast.sma_last),
+    'ema': lambda c, w, t, p: _fmt_ma(c, w or 50, 'EMA', 'Exponential Moving Average', t, p, ta_fast.ema_last),
+    'rsi': lambda c, w, t, p: _fmt_rsi(c, w or 14, t, p),
+    'macd': lambda c, w, t, p: _fmt_macd(c, t, p),
+}
+
+def _ticker_indicator_summary(ticker: str, indicator_name: str, window: Optional[int], prices: Future) -> str:
+    try:
         end_date = datetime.now()
-        start_date = end_date - timedelta(days=365)
+        start_date = end_date - timedelta(days=_history_days(indicator_name, window))
+        today = end_date.strftime('%Y-%m-%d')
+        yesterday = (end_date - timedelta(days=1)).strftime('%Y-%m-%d')
         
-        agg_bars = polygon_client.get_aggs(
-            ticker=ticker,
-            multiplier=1,
-            timespan="day",
-            from_=start_date.strftime('%Y-%m-%d'),
-            to=end_date.strftime('%Y-%m-%d')
+        bars = concat_bars(
+            fetch_daily_bars(ticker, start_date.strftime('%Y-%m-%d'), yesterday, HISTORICAL_BARS_TTL),
+            fetch_daily_bars(ticker, today, today, TODAY_BAR_TTL),
         )
         
-        if not agg_bars:
+        if not bars['close']:
             return f"No historical data found for {ticker}."
-
-        df = pd.DataFrame([{
-            'time': bar.timestamp,
-            'open': bar.open,
-            'high': bar.high,
-            'low': bar.low,
-            'close': bar.close,
-            'volume': bar.volume
-        } for bar in agg_bars])
-        
-        if df.empty:
-            return f"No historical data available for {ticker}."
-        
-        df['time'] = pd.to_datetime(df['time'], unit='ms')
-        df.set_index('time', inplace=True)
-        df.sort_index(inplace=True)
         
-        current_price = df['close'].iloc[-1]
+        # Bars are requested in ascending order and the cached history
+        # precedes today's bar, so they are already sorted. Debug runs verify
+        # that once per process rather than re-walking the bars every request.
+        global _bar_order_checked
+        if __debug__ and not _bar_order_checked:
+            _bar_order_checked = True
+            assert np.all(np.diff(bars['timestamp']) > 0), f"Polygon bars for {ticker} are out of order"
+
+        # Only the closes feed the indicators, so skip the DataFrame and read
+        # them straight into a float32 array.
+        close = np.asarray(bars['close'], dtype=np.float32)
+        current_price = prices.result().get(ticker) or bars['close'][-1]
         
-        if indicator_name == 'sma':
-            window = window or 50
-            df[f'SMA_{window}'] = calculate_sma(df['close'], window)
-            latest_value = df[f'SMA_{window}'].iloc[-1]
-            
-            if pd.isna(latest_value):
-                return f"Not enough data to calculate {window}-day SMA for {ticker}."
-            
-            return f"Polygon.io Data for {ticker}:\n- Current Price: ${current_price:.2f}\n- Simple Moving Average ({window}-day): ${latest_value:.2f}"
-
-        elif indicator_name == 'ema':
-            window = window or 50
-            df[f'EMA_{window}'] = calculate_ema(df['close'], window)
-            latest_value = df[f'EMA_{window}'].iloc[-1]
-            
-            if pd.isna(latest_value):
-                return f"Not enough data to calculate {window}-day EMA for {ticker}."
-            
-            return f"Polygon.io Data for {ticker}:\n- Current Price: ${current_price:.2f}\n- Exponential Moving Average ({window}-day): ${latest_value:.2f}"
-
-        elif indicator_name == 'rsi':
-            window = window or 14
-            df[f'RSI_{window}'] = calculate_rsi(df['close'], window)
-            latest_value = df[f'RSI_{window}'].iloc[-1]
-            
-            if pd.isna(latest_value):
-                return f"Not enough data to calculate {window}-day RSI for {ticker}."
-            
-            rsi_signal = "Overbought" if latest_value > 70 else "Oversold" if latest_value < 30 else "Neutral"
-            return f"Polygon.io Data for {ticker}:\n- Current Price: ${current_price:.2f}\n- RSI ({window}-day): {latest_value:.2f} ({rsi_signal})"
-            
-        elif indicator_name == 'macd':
-            macd_line, signal_line, histogram = calculate_macd(df['close'])
-            df['MACD'] = macd_line
-            df['MACD_signal'] = signal_line
-            df['MACD_hist'] = histogram
-            
-            latest_macd = df['MACD'].iloc[-1]
-            latest_signal = df['MACD_signal'].iloc[-1]
-            latest_hist = df['MACD_hist'].iloc[-1]
-            
-            if pd.isna(latest_macd) or pd.isna(latest_signal):
-                return f"Not enough data to calculate MACD for {ticker}."
-            
-            macd_signal = "Bullish" if latest_macd > latest_signal else "Bearish"
-            return f"Polygon.io Data for {ticker}:\n- Current Price: ${current_price:.2f}\n- MACD: {latest_macd:.4f}\n- Signal Line: {latest_signal:.4f}\n- Histogram: {latest_hist:.4f}\n- Signal: {macd_signal}"
-
-        else:
-            return f"Indicator '{indicator_name}' not supported. Available: SMA, EMA, RSI, MACD."
+        return _INDICATOR_HANDLERS[indicator_name](close, window, ticker, current_price)
+
+    except Exception as e:
+        log.exception("Indicator error for %s", ticker)
+        return f"Error getting technical indicators for {ticker}: {str(e)}"
 
+def get_technical_indicators(query: str, api_key: str, entities: dict | None = None) -> str:
+    """
+    Reports the requested indicator for every ticker in the query. The
+    per-ticker Polygon requests are I/O bound, so they run on a thread pool.
+    """
+    ticker_symbols = []
+    try:
+        ticker_info = entities if entities is not None else extract_financial_entities(query, api_key)
+        if ticker_info and ticker_info.get('tickers'):
+            ticker_symbols = ticker_info['tickers']
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        return f"Error getting technical indicators for {ticker}: {str(e)}"
\ No newline at end of file
+        log.warning("LLM extraction failed: %s", e)
+    
+    if not ticker_symbols:
+        ticker = extract_ticker_fallback(query)
+        if not ticker:
+            return "Could not identify a stock ticker. Please specify a company name or ticker symbol."
+        ticker_symbols = [ticker]
+    
+    log.info("Using tickers: %s", ticker_symbols)
+
+    indicator_name, window = _parse_indicator_request(query, api_key)
+    if indicator_name not in _INDICATOR_HANDLERS:
+        return f"Indicator '{indicator_name}' not supported. Available: SMA, EMA, RSI, MACD."
+
+    # Current prices for all tickers come from a single snapshot request,
+    # issued alongside the per-ticker bar requests.
+    with ThreadPoolExecutor(max_workers=min(MAX_TICKER_WORKERS, len(ticker_symbols)) + 1) as executor:
+        prices = executor.submit(fetch_current_prices, ticker_symbols)
+        all_summaries = list(executor.map(
+            lambda ticker: _ticker_indicator_summary(ticker, indicator_name, window, prices),
+            ticker_symbols,
+        ))
+
+    return "\n\n---\n\n".join(all_summaries)
@@ -1,18 +1,122 @@
 # backend/core/data_sources/sec_edgar.py
 
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
 from sec_api import QueryApi
 from backend.config import settings
 # 1. Import the flexible entity extraction function
 from .yahoo_finance import extract_financial_entities
+from .cache import FileCache
+
+log = logging.getLogger(__name__)
 
 query_api = QueryApi(api_key=settings.SEC_API_KEY)
 
-def get_sec_filings(query: str, api_key: str) -> str:
+# New filings appear at most a few times a quarter, so search results are
+# reused for a few hours instead of hitting the SEC API on every query.
+filings_cache = FileCache("sec_edgar")
+FILINGS_TTL = 6 * 3600
+# Upper bound on tickers fetched concurrently for one query.
+MAX_TICKER_WORKERS = 8
+
+
+def fetch_filings(ticker: str, form_type: str) -> list[dict]:
+    """Returns the 3 most recent `form_type` filings for `ticker`, served from the file cache when fresh."""
+    key = f"{ticker}|{form_type}"
+    filings = filings_cache.get(key, FILINGS_TTL)
+    if filings is not None:
+        return filings
+
+    api_query = {
+        "query": {"query_string": {"query": f"ticker:{ticker} AND formType:({form_type})"}},
+        "from": "0", "size": "3",
+        "sort": [{"filedAt": {"order": "desc"}}]
+    }
+    response = query_api.get_filings(api_query)
+    filings = [_summary_fields(filing) for filing in response.get('filings', [])]
+    # An empty result may be a transient search failure; don't hide the ticker's filings for hours.
+    if filings:
+        filings_cache.set(key, filings)
+    return filings
+
+def _summary_fields(filing: dict) -> dict:
+    # Keep only the fields the summary prints; a filing missing one still renders.
+    return {field: filing.get(field, "N/A") for field in ("formType", "companyName", "filedAt", "linkToFilingDetails")}
+
+def prefetch_filings(tickers: list[str], form_type: str) -> dict[str, list[dict]]:
+    """
+    Fetches the latest filings of all uncached `tickers` with a single OR query
+    and regroups them per ticker. Only complete lists are kept: a ticker with
+    fewer than 3 filings in the combined result may just have been crowded
+    out by a prolific filer, so unless the response holds every match it is
+    left for `fetch_filings`.
+    """
+    prefetched = {}
+    missing = []
+    for ticker in tickers:
+        filings = filings_cache.get(f"{ticker}|{form_type}", FILINGS_TTL)
+        if filings is None:
+            missing.append(ticker)
+        else:
+            prefetched[ticker] = filings
+    if len(missing) < 2:
+        return prefetched
+
+    ticker_clause = " OR ".join(f"ticker:{ticker}" for ticker in missing)
+    size = 3 * len(missing)
+    api_query = {
+        "query": {"query_string": {"query": f"({ticker_clause}) AND formType:({form_type})"}},
+        "from": "0", "size": str(size),
+        "sort": [{"filedAt": {"order": "desc"}}]
+    }
+    try:
+        response = query_api.get_filings(api_query)
+    except Exception as e:
+        log.warning("Batched filings query failed, fetching per ticker: %s", e)
+        return prefetched
+
+    grouped = {ticker: [] for ticker in missing}
+    for filing in response.get('filings', []):
+        filings = grouped.get(filing.get('ticker'))
+        if filings is not None and len(filings) < 3:
+            filings.append(_summary_fields(filing))
+    total = response.get('total') or {}
+    all_returned = total.get('relation') == 'eq' and total.get('value', size + 1) <= size
+    for ticker, filings in grouped.items():
+        if len(filings) == 3 or (filings and all_returned):
+            filings_cache.set(f"{ticker}|{form_type}", filings)
+            prefetched[ticker] = filings
+    return prefetched
+
+def _ticker_filings_summary(ticker: str, form_type: str, filings: list[dict] | None = None) -> str:
+    try:
+        if filings is None:
+            filings = fetch_filings(ticker, form_type)
+
+        if not filings:
+            form_names = form_type.replace('"', '')
+            return f"No recent {form_names} filings found for {ticker} via SEC API."
+
+        ticker_header = f"Latest SEC filings for {ticker}:\n"
+        filing_details = [
+            f"Filing: {filing['formType']} for {filing['companyName']}\n"
+            f"Filed On: {filing['filedAt'][:10]}\n"
+            f"Link: {filing['linkToFilingDetails']}"
+            for filing in filings
+        ]
+        return ticker_header + "\n\n".join(filing_details)
+
+    except Exception as e:
+        return f"Error fetching SEC filings for {ticker}: {e}"
+
+def get_sec_filings(query: str, api_key: str, entities: dict | None = None) -> str:
     """
     Fetches recent SEC filings for ALL tickers identified in the query by the central AI extractor.
     """
-    # 2. Use the central extractor to get the tickers
-    entities = extract_financial_entities(query, api_key)
+    # 2. Use the central extractor to get the tickers (unless the workflow already did)
+    if entities is None:
+        entities = extract_financial_entities(query, api_key)
     ticker_symbols = entities.get("tickers", [])
     
     if not ticker_symbols:
@@ -30,34 +134,14 @@ def get_sec_filings(query: str, api_key: str) -> str:
     elif "8-k" in query_lower:
         form_type = "\"8-K\""
 
-    all_filing_summaries = []
-    # 3. Loop through each identified ticker
-    for ticker in ticker_symbols:
-        try:
-            api_query = {
-                "query": {"query_string": {"query": f"ticker:{ticker} AND formType:({form_type})"}},
-                "from": "0", "size": "3",
-                "sort": [{"filedAt": {"order": "desc"}}]
-            }
-
-            response = query_api.get_filings(api_query)
-            filings = response.get('filings', [])
-
-            if not filings:
-                all_filing_summaries.append(f"No recent {form_type.replace('\"', '')} filings found for {ticker} via SEC API.")
-                continue
-
-            ticker_header = f"Latest SEC filings for {ticker}:\n"
-            filing_details = [
-                f"Filing: {filing['formType']} for {filing['companyName']}\n"
-                f"Filed On: {filing['filedAt'][:10]}\n"
-                f"Link: {filing['linkToFilingDetails']}"
-                for filing in filings
-            ]
-            all_filing_summaries.append(ticker_header + "\n\n".join(filing_details))
-
-        except Exception as e:
-            all_filing_summaries.append(f"Error fetching SEC filings for {ticker}: {e}")
+    # 3. One combined query covers most tickers; any left over are fetched
+    #    concurrently, since the SEC API calls are I/O bound
+    prefetched = prefetch_filings(ticker_symbols, form_type)
+    with ThreadPoolExecutor(max_workers=min(MAX_TICKER_WORKERS, len(ticker_symbols))) as executor:
+        all_filing_summaries = list(executor.map(
+            lambda ticker: _ticker_filings_summary(ticker, form_type, prefetched.get(ticker)),
+            ticker_symbols,
+        ))
 
     # 4. Aggregate the results
     return "\n\n---\n\n".join(all_filing_summaries)
\ No newline at end of file
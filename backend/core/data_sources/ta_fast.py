@@ -0,0 +1,87 @@
+# backend/core/data_sources/ta_fast.py
+
+"""
+Latest-value technical indicators on plain NumPy arrays of closing prices.
+
+The data sources only report the most recent indicator value, so these
+return a single float instead of building a full-length series. A result of
+NaN means there is not enough history for the requested window.
+
+Inputs may be float32 to halve memory traffic; sums and recurrences are
+carried in float64 so the results do not lose precision.
+
+The recurrences (EMA, Wilder smoothing, MACD) are compiled with Numba when it
+is installed; otherwise they run as plain Python.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _jit(func):
+    if njit is None:
+        return func
+    try:
+        return njit(cache=True, fastmath=True)(func)
+    except RuntimeError:
+        # No writable cache location (e.g. read-only deploys): compile per process.
+        return njit(fastmath=True)(func)
+
+
+def sma_last(close: np.ndarray, n: int) -> float:
+    if len(close) < n:
+        return math.nan
+    return float(close[-n:].mean(dtype=np.float64))
+
+
+@_jit
+def ema_last(close: np.ndarray, n: int) -> float:
+    # Same recurrence as pandas' ewm(span=n, adjust=False), seeded with the first close.
+    if len(close) == 0:
+        return math.nan
+    a = 2.0 / (n + 1)
+    e = np.float64(close[0])
+    for x in close[1:]:
+        e = a * x + (1 - a) * e
+    return float(e)
+
+
+@_jit
+def rsi_last(close: np.ndarray, n: int = 14) -> float:
+    # Wilder's RSI: seed with the simple average of the first n moves, then smooth.
+    d = np.diff(close.astype(np.float64))
+    if len(d) < n:
+        return math.nan
+    up = np.where(d > 0, d, 0.0)
+    dn = np.where(d < 0, -d, 0.0)
+    au = up[:n].mean()
+    ad = dn[:n].mean()
+    for i in range(n, len(d)):
+        au = (au * (n - 1) + up[i]) / n
+        ad = (ad * (n - 1) + dn[i]) / n
+    if ad == 0:
+        return 100.0 if au > 0 else math.nan
+    return float(100 - 100 / (1 + au / ad))
+
+
+@_jit
+def macd_last(close: np.ndarray, f: int = 12, s: int = 26, sig: int = 9) -> tuple[float, float, float]:
+    """Returns the latest (MACD line, signal line, histogram)."""
+    if len(close) == 0:
+        return math.nan, math.nan, math.nan
+    close = close.astype(np.float64)
+    af, as_, asig = 2.0 / (f + 1), 2.0 / (s + 1), 2.0 / (sig + 1)
+    ef = es = close[0]
+    signal = 0.0
+    for x in close[1:]:
+        ef = af * x + (1 - af) * ef
+        es = as_ * x + (1 - as_) * es
+        signal = asig * (ef - es) + (1 - asig) * signal
+    macd = ef - es
+    return float(macd), float(signal), float(macd - signal)
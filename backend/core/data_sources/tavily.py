@@ -1,5 +1,11 @@
 from tavily import TavilyClient
 from backend.config import settings
+from backend.core.data_sources.cache import FileCache
+
+# Web results for the same query are reused briefly; recency still matters
+# for news-like questions, so the window is kept short.
+search_cache = FileCache("tavily")
+SEARCH_RESULTS_TTL = 30 * 60
 
 
 def search_web(query: str, api_key: str) -> str:
@@ -10,18 +16,23 @@ def search_web(query: str, api_key: str) -> str:
     Uses the native Tavily Python client (recommended and future-proof).
     """
     try:
-        # Initialize Tavily client with API key
-        client = TavilyClient(api_key=settings.TAVILY_API_KEY)
-        
-        # Perform search with financial context
-        response = client.search(
-            query=query,
-            max_results=5,  # Get more results for better context
-            search_depth="advanced",  # Use advanced for financial queries
-            include_answer=True,   # Get AI-generated summary
-            include_raw_content=False,  # Don't need full HTML
-            topic="finance"  # Optional: can be "general", "news", or "finance"
-        )
+        response = search_cache.get(query, SEARCH_RESULTS_TTL)
+        if response is None:
+            # Initialize Tavily client with API key
+            client = TavilyClient(api_key=settings.TAVILY_API_KEY)
+            
+            # Perform search with financial context
+            response = client.search(
+                query=query,
+                max_results=5,  # Get more results for better context
+                search_depth="advanced",  # Use advanced for financial queries
+                include_answer=True,   # Get AI-generated summary
+                include_raw_content=False,  # Don't need full HTML
+                topic="finance"  # Optional: can be "general", "news", or "finance"
+            )
+            # Don't pin a transient "no results" answer for the whole TTL.
+            if response and response.get('results'):
+                search_cache.set(query, response)
         
         # Check if we got results
         if not response or 'results' not in response:
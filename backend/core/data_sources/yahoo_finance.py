@@ -4,11 +4,21 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 import yfinance as yf
 import re
-import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import orjson
+from functools import lru_cache
+from cachetools import TTLCache
+from pydantic import BaseModel, Field
 from backend.config import settings
-import pandas as pd
+from .cache import CACHE_DIR, FileCache
+import numpy as np
 from datetime import datetime, timedelta
 
+log = logging.getLogger(__name__)
+
 # google_client = ChatGoogleGenerativeAI(
 #     model="gemini-2.5-flash-lite", api_key=settings.GOOGLE_API_KEY
 # )
@@ -44,43 +54,159 @@ def format_news_safely(news_items):
             
             formatted_news.append(f"• {title} - {publisher}")
         except Exception as e:
-            print(f"[Yahoo Finance] Error formatting news item: {e}")
+            log.warning("Error formatting news item: %s", e)
             continue
     
     return "\n".join(formatted_news) if formatted_news else "• No recent news available"
 
+# Crypto symbols Gemini sometimes leaves in "tickers" despite the prompt. Bare
+# symbols are only rerouted when they are not also listed stocks.
+_CRYPTO_BASES = frozenset({"BTC", "ETH", "XRP", "DOGE"})
+_FIAT_QUOTES = frozenset({"USD", "EUR", "GBP", "JPY", "CAD", "AUD", "INR"})
+
+
+def _route_crypto_tickers(raw_tickers: list, crypto: list[str]) -> tuple[list[str], list[str]]:
+    """Splits extracted tickers into stocks and BASE-QUOTE crypto pairs with set lookups."""
+    tickers = []
+    for t in raw_tickers:
+        if not isinstance(t, str):
+            continue
+        tu = t.strip().upper()
+        base, _, quote = tu.partition('-')
+        if quote in _FIAT_QUOTES or (not quote and base in _CRYPTO_BASES):
+            crypto.append(f"{base}-{quote or 'USD'}")
+        else:
+            tickers.append(tu)
+    return tickers, list(dict.fromkeys(crypto))
+
+# Fast path for simple queries ("AAPL RSI", "$MSFT 50-day SMA", "Tesla stock
+# price"): when every word is a ticker, a known company name or filler, the
+# tickers are taken directly and Gemini is not called. Anything else (metrics,
+# statements, crypto, group names like FAANG, non-US listings) goes to Gemini.
+_QUERY_WORD_RE = re.compile(r"\$?[A-Za-z][\w.'&/-]*")
+_US_TICKER_RE = re.compile(r'[A-Z]{1,5}')
+_TICKER_ALIASES = {
+    'apple': 'AAPL', 'microsoft': 'MSFT', 'google': 'GOOGL',
+    'alphabet': 'GOOGL', 'amazon': 'AMZN', 'tesla': 'TSLA',
+    'meta': 'META', 'facebook': 'META', 'nvidia': 'NVDA',
+    'netflix': 'NFLX', 'amd': 'AMD', 'intel': 'INTC'
+}
+_SIMPLE_QUERY_WORDS = frozenset({
+    'rsi', 'sma', 'ema', 'macd', 'moving', 'average', 'exponential', 'relative',
+    'strength', 'index', 'day', 'days', 'period', 'technical', 'indicator',
+    'indicators', 'analysis', 'price', 'prices', 'stock', 'stocks', 'share',
+    'shares', 'quote', 'current', 'latest', 'today', "today's", 'now', 'of',
+    'for', 'the', 'on', 'and', 'vs', 'versus', 'what', 'is', "what's", 'show',
+    'me', 'get', 'a', 'an', 'how', 'are',
+})
+# Upper-case words that look like tickers but need Gemini to interpret.
+_NOT_TICKERS = _CRYPTO_BASES | {'FAANG', 'MAANG', 'GDP', 'CPI', 'ETF', 'IPO', 'EPS', 'CEO', 'USD'}
+_DEFAULT_METRICS = ["currentPrice", "trailingPE", "marketCap"]
+
+
+def _fast_extract_entities(query: str) -> dict | None:
+    """Returns entities for ticker-only queries without calling Gemini, or None."""
+    tickers = []
+    for word in _QUERY_WORD_RE.findall(query):
+        if word.startswith('$'):
+            symbol = word[1:].upper()
+            if not _US_TICKER_RE.fullmatch(symbol):
+                return None
+            tickers.append(symbol)
+            continue
+        lowered = word.lower().removesuffix("'s")
+        if lowered in _SIMPLE_QUERY_WORDS:
+            continue
+        if lowered in _TICKER_ALIASES:
+            tickers.append(_TICKER_ALIASES[lowered])
+        elif _US_TICKER_RE.fullmatch(word) and word not in _NOT_TICKERS:
+            tickers.append(word)
+        else:
+            return None
+    if not tickers:
+        return None
+    return {"tickers": list(dict.fromkeys(tickers)), "metrics": list(_DEFAULT_METRICS), "data_types": ["info"], "crypto": []}
+
 def extract_financial_entities(query: str, api_key: str) -> dict:
     """
-    Uses Gemini (via LangChain wrapper) to extract tickers, metrics, and data types.
-    Returns: {"tickers": [...], "metrics": [...], "data_types": [...]}
+    Uses Gemini (via LangChain wrapper) to extract tickers, metrics, data types and
+    crypto instruments in a single call, so every data source can share one extraction.
+    Ticker-only queries skip Gemini via `_fast_extract_entities`.
+    Results are memoized per whitespace-normalized query for `ENTITY_CACHE_TTL`
+    seconds; each call gets its own copy.
+    Returns: {"tickers": [...], "metrics": [...], "data_types": [...], "crypto": [...]}
     """
 
     if not api_key:
-        return {"tickers": [], "metrics": [], "data_types": ["info"]}
+        return {"tickers": [], "metrics": [], "data_types": ["info"], "crypto": []}
 
-    google_client = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash-lite", api_key=api_key
-    )
+    # Tools that receive the raw query re-extract it; collapsing whitespace lets
+    # trivially different spellings of one question share a cache entry.
+    query = " ".join(query.split())
+
+    entities = _fast_extract_entities(query)
+    if entities is not None:
+        log.debug("Entities from fast path: %s", entities)
+        return entities
 
     try:
-        possible_metrics = [
-            "previousClose", "open", "dayLow", "dayHigh", "regularMarketPrice", "currentPrice",
-            "fiftyTwoWeekHigh", "fiftyTwoWeekLow", "volume", "averageVolume",
-            "marketCap", "enterpriseValue", "trailingPE", "forwardPE", "priceToSalesTrailing12Months",
-            "enterpriseToRevenue", "bookValue", "priceToBook",
-            "profitMargins", "operatingMargins", "returnOnEquity", "returnOnAssets", "debtToEquity",
-            "totalRevenue", "revenueGrowth", "earningsGrowth", "ebitda", "totalCash", "totalDebt",
-            "dividendYield", "dividendRate", "payoutRatio", "exDividendDate",
-            "sector", "industry", "fullTimeEmployees", "website", "businessSummary"
-        ]
-
-        data_types = [
-            "info", "history", "news", "financials", "balance_sheet", "cashflow", "earnings", "calendar"
-        ]
-
-        # Build the prompt as a regular string (no f-string to avoid conflicts with LangChain)
-        prompt_text = """
-        You are an expert financial entity and data extractor. Analyze the user's query and perform three tasks:
+        entities_json = _extract_cached(query, api_key)
+    except _EntityExtractionFailed:
+        return {"tickers": [], "metrics": [], "data_types": ["info"], "crypto": []}
+    return orjson.loads(entities_json)
+
+
+class _EntityExtractionFailed(Exception):
+    """Raised instead of returning defaults, so failed extractions are not memoized."""
+
+
+# Entities of a query don't change, but expiring them bounds how long a poor
+# extraction (or a renamed ticker) sticks around.
+ENTITY_CACHE_TTL = 3600
+_entity_cache = TTLCache(maxsize=1024, ttl=ENTITY_CACHE_TTL)
+_entity_cache_lock = threading.Lock()
+
+
+def _extract_cached(query: str, api_key: str) -> bytes:
+    # Cached as encoded JSON: immutable, and callers can't mutate each other's result.
+    # Keyed by a fixed-size digest of the normalized query only, so repeat
+    # questions are shared across users; the API key just pays for misses.
+    key = hashlib.blake2b(query.strip().lower().encode(), digest_size=16).digest()
+    with _entity_cache_lock:
+        entities_json = _entity_cache.get(key)
+    if entities_json is not None:
+        log.debug("Entity extraction cache hit for: %s", query)
+        return entities_json
+
+    # Gemini is called outside the lock so concurrent queries don't serialize.
+    entities = _extract_entities(query, api_key)
+    if entities is None:
+        raise _EntityExtractionFailed(query)
+    entities_json = orjson.dumps(entities)
+    with _entity_cache_lock:
+        _entity_cache[key] = entities_json
+    return entities_json
+
+
+POSSIBLE_METRICS = [
+    "previousClose", "open", "dayLow", "dayHigh", "regularMarketPrice", "currentPrice",
+    "fiftyTwoWeekHigh", "fiftyTwoWeekLow", "volume", "averageVolume",
+    "marketCap", "enterpriseValue", "trailingPE", "forwardPE", "priceToSalesTrailing12Months",
+    "enterpriseToRevenue", "bookValue", "priceToBook",
+    "profitMargins", "operatingMargins", "returnOnEquity", "returnOnAssets", "debtToEquity",
+    "totalRevenue", "revenueGrowth", "earningsGrowth", "ebitda", "totalCash", "totalDebt",
+    "dividendYield", "dividendRate", "payoutRatio", "exDividendDate",
+    "sector", "industry", "fullTimeEmployees", "website", "businessSummary"
+]
+
+DATA_TYPES = [
+    "info", "history", "news", "financials", "balance_sheet", "cashflow", "earnings", "calendar"
+]
+
+# Parsed once; the metric and data-type lists are filled in up front, so each
+# call only substitutes the query.
+_EXTRACT_TEMPLATE = ChatPromptTemplate.from_template("""
+        You are an expert financial entity and data extractor. Analyze the user's query and perform four tasks:
 
         1. Extract Tickers: Identify all stock tickers or company names.
         - Append correct exchange suffix for non-US stocks:
@@ -90,110 +216,257 @@ def extract_financial_entities(query: str, api_key: str) -> dict:
         - Normalize company names to primary ticker and expand acronyms where appropriate.
 
         2. Extract Metrics: Identify specific financial metrics requested.
-        - Select from: """ + str(possible_metrics) + """
+        - Select from: {metrics}
         - Map natural language (e.g., "P/E ratio" -> "trailingPE")
         - Default if none specified: ["currentPrice", "trailingPE", "marketCap"]
 
         3. Extract Data Types: Determine what type of data is needed.
-        - Select from: """ + str(data_types) + """
+        - Select from: {data_types}
         - Default: ["info"]
 
-        Return ONLY valid JSON with no additional text or markdown formatting. Use this exact format:
-        {{"tickers": ["TICKER1", "TICKER2"], "metrics": ["metric1", "metric2"], "data_types": ["type1"]}}
+        4. Extract Crypto Instruments: Identify any cryptocurrencies mentioned.
+        - Format: BASE-QUOTE (BTC-USD, ETH-EUR). Default quote currency: USD.
+        - For a general crypto market query, return: ["BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD", "DOGE-USD"]
+        - If the query does not involve cryptocurrencies, return []
+        - Cryptocurrencies go ONLY in "crypto", never in "tickers".
 
         Examples:
-        - "Apple stock price" -> {{"tickers": ["AAPL"], "metrics": ["currentPrice"], "data_types": ["info"]}}
-        - "Tesla news and earnings" -> {{"tickers": ["TSLA"], "metrics": [], "data_types": ["news", "earnings"]}}
-        - "Microsoft financial statements" -> {{"tickers": ["MSFT"], "metrics": [], "data_types": ["financials", "balance_sheet", "cashflow"]}}
-        - "NVDA price history last month" -> {{"tickers": ["NVDA"], "metrics": [], "data_types": ["history"]}}
-        - "Compare Apple and Microsoft P/E" -> {{"tickers": ["AAPL", "MSFT"], "metrics": ["trailingPE"], "data_types": ["info"]}}
+        - "Apple stock price" -> {{"tickers": ["AAPL"], "metrics": ["currentPrice"], "data_types": ["info"], "crypto": []}}
+        - "Tesla news and earnings" -> {{"tickers": ["TSLA"], "metrics": [], "data_types": ["news", "earnings"], "crypto": []}}
+        - "Microsoft financial statements" -> {{"tickers": ["MSFT"], "metrics": [], "data_types": ["financials", "balance_sheet", "cashflow"], "crypto": []}}
+        - "NVDA price history last month" -> {{"tickers": ["NVDA"], "metrics": [], "data_types": ["history"], "crypto": []}}
+        - "Compare Apple and Microsoft P/E" -> {{"tickers": ["AAPL", "MSFT"], "metrics": ["trailingPE"], "data_types": ["info"], "crypto": []}}
+        - "Price of ethereum and Coinbase stock" -> {{"tickers": ["COIN"], "metrics": ["currentPrice"], "data_types": ["info"], "crypto": ["ETH-USD"]}}
 
         User Query: {query}
-        """
-        
-        chat_prompt = ChatPromptTemplate.from_template(prompt_text)
-        response = google_client.invoke(chat_prompt.format_messages(query=query))
-        content = response.content
-        
-        # Debug: Print raw response
-        print(f"[DEBUG] Raw Gemini response: {content}")
+        """).partial(metrics=str(POSSIBLE_METRICS), data_types=str(DATA_TYPES))
+
+# Entity extraction only needs the gist of a question; longer input (e.g. a
+# pasted article) is cut so it can't inflate the prompt.
+MAX_QUERY_CHARS = 2000
+
+
+class FinancialEntities(BaseModel):
+    """Entities extracted from a user's financial query"""
+    tickers: list[str] = Field(default_factory=list, description="Stock tickers, with exchange suffix for non-US stocks")
+    metrics: list[str] = Field(default_factory=list, description="Requested financial metrics")
+    data_types: list[str] = Field(default_factory=lambda: ["info"], description="Requested data types")
+    crypto: list[str] = Field(default_factory=list, description="Crypto instruments as BASE-QUOTE")
+
+
+@lru_cache(maxsize=8)
+def _get_google_client(api_key: str):
+    # One client per user key, so repeat extractions reuse its HTTP connection.
+    # Structured output: Gemini fills the schema directly, so there is no JSON to dig out of text.
+    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", api_key=api_key, temperature=0)
+    return llm.with_structured_output(FinancialEntities)
 
-        # Try to extract JSON from markdown code blocks first
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-            # Try to find JSON without code blocks
-            json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', content, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-            else:
-                # No JSON found
-                print(f"[WARN] No JSON found in response, using defaults")
-                return {"tickers": [], "metrics": [], "data_types": ["info"]}
-        
-        # Clean up the JSON string
-        json_str = json_str.strip()
-        
-        # Debug: Print extracted JSON
-        print(f"[DEBUG] Extracted JSON: {json_str}")
-        
-        # Parse JSON
-        try:
-            entities = json.loads(json_str)
-        except json.JSONDecodeError as je:
-            print(f"[ERROR] JSON decode error: {je}")
-            print(f"[ERROR] Attempted to parse: {json_str}")
-            return {"tickers": [], "metrics": [], "data_types": ["info"]}
+
+def _extract_entities(query: str, api_key: str) -> dict | None:
+    """Runs the Gemini extraction; returns None if no usable entities came back."""
+
+    google_client = _get_google_client(api_key)
+
+    try:
+        entities = google_client.invoke(_EXTRACT_TEMPLATE.format_messages(query=query[:MAX_QUERY_CHARS]))
+        if entities is None:
+            return None
 
         # Standardize keys and types
+        tickers, crypto = _route_crypto_tickers(
+            entities.tickers,
+            [c.strip().upper() for c in entities.crypto if c.strip()],
+        )
         result = {
-            "tickers": [t.upper() for t in entities.get("tickers", []) if isinstance(t, str)],
-            "metrics": entities.get("metrics", []),
-            "data_types": entities.get("data_types", ["info"])
+            "tickers": tickers,
+            "metrics": entities.metrics,
+            "data_types": entities.data_types or ["info"],
+            "crypto": crypto
         }
         
-        print(f"[DEBUG] Parsed entities: {result}")
+        log.debug("Parsed entities: %s", result)
         return result
 
     except Exception as e:
-        print(f"🚨 Error in Gemini entity extraction: {e}")
-        import traceback
-        print(traceback.format_exc())
-        return {"tickers": [], "metrics": [], "data_types": ["info"]}
+        log.exception("Gemini entity extraction failed: %s", e)
+        return None
+
+CURRENCY_SYMBOLS = {
+    'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥', 'INR': '₹', 'CAD': 'C$',
+    'AUD': 'A$', 'CHF': 'CHF ', 'CNY': '¥', 'HKD': 'HK$', 'SGD': 'S$',
+    'KRW': '₩', 'BRL': 'R$', 'MXN': '$', 'RUB': '₽', 'ZAR': 'R', 'SEK': 'kr',
+    'NOK': 'kr', 'DKK': 'kr', 'PLN': 'zł', 'CZK': 'Kč', 'HUF': 'Ft', 'ILS': '₪',
+    'TRY': '₺', 'THB': '฿', 'MYR': 'RM', 'IDR': 'Rp', 'PHP': '₱', 'VND': '₫',
+    'TWD': 'NT$', 'NZD': 'NZ$'
+}
 
 def get_currency_symbol(info):
-    currency_map = {
-        'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥', 'INR': '₹', 'CAD': 'C$',
-        'AUD': 'A$', 'CHF': 'CHF ', 'CNY': '¥', 'HKD': 'HK$', 'SGD': 'S$',
-        'KRW': '₩', 'BRL': 'R$', 'MXN': '$', 'RUB': '₽', 'ZAR': 'R', 'SEK': 'kr',
-        'NOK': 'kr', 'DKK': 'kr', 'PLN': 'zł', 'CZK': 'Kč', 'HUF': 'Ft', 'ILS': '₪',
-        'TRY': '₺', 'THB': '฿', 'MYR': 'RM', 'IDR': 'Rp', 'PHP': '₱', 'VND': '₫',
-        'TWD': 'NT$', 'NZD': 'NZ$'
-    }
     currency_code = info.get('financialCurrency') or info.get('currency') or 'USD'
-    return currency_map.get(currency_code, currency_code + ' ')
+    return CURRENCY_SYMBOLS.get(currency_code, currency_code + ' ')
+
+
+def _fmt_big_money(value, currency_symbol):
+    return f"{currency_symbol}{value:,.0f}" if value > 1000000 else f"{currency_symbol}{value:,.2f}"
+
+def _fmt_price(value, currency_symbol):
+    return f"{currency_symbol}{value:.2f}"
+
+def _fmt_pct(value, currency_symbol):
+    return f"{value:.2%}" if abs(value) <= 1 else f"{value:.2f}%"
+
+def _fmt_count(value, currency_symbol):
+    return f"{value:,.0f}"
+
+def _fmt_default(value, currency_symbol):
+    return f"{value:,.2f}"
+
+def _fmt_text(value, currency_symbol):
+    return str(value)
+
+# metric -> formatter(value, currency_symbol), built once instead of scanning lists per call
+_METRIC_FORMATTERS = {
+    **dict.fromkeys(['marketCap', 'enterpriseValue', 'totalRevenue', 'ebitda', 'totalCash', 'totalDebt'], _fmt_big_money),
+    **dict.fromkeys(['currentPrice', 'previousClose', 'open', 'dayHigh', 'dayLow', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow', 'bookValue', 'dividendRate'], _fmt_price),
+    **dict.fromkeys(['dividendYield', 'profitMargins', 'operatingMargins', 'returnOnEquity', 'returnOnAssets', 'revenueGrowth', 'earningsGrowth', 'payoutRatio'], _fmt_pct),
+    **dict.fromkeys(['volume', 'averageVolume', 'fullTimeEmployees'], _fmt_count),
+    # Shown verbatim, even when numeric (exDividendDate is an epoch timestamp).
+    **dict.fromkeys(['sector', 'industry', 'website', 'businessSummary', 'exDividendDate'], _fmt_text),
+}
 
 
 def format_currency_value(value, currency_symbol, metric):
     if isinstance(value, (int, float)):
-        if metric in ['marketCap', 'enterpriseValue', 'totalRevenue', 'ebitda', 'totalCash', 'totalDebt']:
-            return f"{currency_symbol}{value:,.0f}" if value > 1000000 else f"{currency_symbol}{value:,.2f}"
-        elif metric in ['currentPrice', 'previousClose', 'open', 'dayHigh', 'dayLow', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow', 'bookValue', 'dividendRate']:
-            return f"{currency_symbol}{value:.2f}"
-        elif metric in ['dividendYield', 'profitMargins', 'operatingMargins', 'returnOnEquity', 'returnOnAssets', 'revenueGrowth', 'earningsGrowth', 'payoutRatio']:
-            return f"{value:.2%}" if abs(value) <= 1 else f"{value:.2f}%"
-        elif metric in ['volume', 'averageVolume', 'fullTimeEmployees']:
-            return f"{value:,.0f}"
-        else:
-            return f"{value:,.2f}"
+        return _METRIC_FORMATTERS.get(metric, _fmt_default)(value, currency_symbol)
     else:
         return str(value)
 
 
+# Raw Yahoo responses are cached on disk, with lifetimes that follow how often
+# each endpoint changes. Statements change quarterly, but a day keeps a fresh
+# filing from being hidden for a whole quarter.
+yahoo_cache = FileCache("yahoo_finance")
+# yfinance keeps its cookie/crumb and ticker-timezone caches in the user cache
+# directory, which is read-only on serverless hosts; there it silently falls
+# back to renegotiating the crumb and refetching timezones in every process.
+# (Its HTTP session is already one shared curl_cffi session per process.)
+yf.set_tz_cache_location(str(CACHE_DIR / "yfinance"))
+INFO_TTL = 5 * 60
+NEWS_TTL = 15 * 60
+HISTORY_TTL = 3600
+STATEMENT_TTL = 24 * 3600
+_HISTORY_COLUMNS = ('Close', 'High', 'Low', 'Volume')
+
+# Cache key -> Future of the Yahoo call currently fetching it.
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _coalesce(key: str, fetch):
+    """
+    Runs `fetch` once for all concurrent callers asking for the same `key`:
+    the first caller does the request, the others wait on its Future and get
+    the same result or exception.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if leader:
+        try:
+            future.set_result(fetch())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with _inflight_lock:
+                del _inflight[key]
+    return future.result()
+
+
+def _fetch_cached(key: str, ttl_seconds: float, fetch):
+    return yahoo_cache.get_or_fetch(key, ttl_seconds, lambda: _coalesce(key, fetch))
+
+
+def _cached_info(ticker) -> dict:
+    return _fetch_cached(f"{ticker.ticker}|info", INFO_TTL, lambda: ticker.info) or {}
+
+
+def _cached_news(ticker) -> list:
+    return _fetch_cached(f"{ticker.ticker}|news", NEWS_TTL, lambda: ticker.news) or []
+
+
+def _history_columns(hist) -> dict[str, list] | None:
+    if hist.empty:
+        return None
+    # One ndarray extract for all columns instead of a pandas lookup per column.
+    values = hist[list(_HISTORY_COLUMNS)].to_numpy(dtype=np.float64).T.tolist()
+    return {'Date': hist.index.strftime('%Y-%m-%d').tolist(), **dict(zip(_HISTORY_COLUMNS, values))}
+
+
+def _cached_history(ticker, period: str) -> dict[str, list] | None:
+    """Daily history for `period` as one list per column plus 'Date', or None if empty."""
+    return _fetch_cached(
+        f"{ticker.ticker}|history|{period}", HISTORY_TTL, lambda: _history_columns(ticker.history(period=period))
+    )
+
+
+# Symbols per yf.download call; Yahoo's chart batching degrades beyond this.
+HISTORY_BATCH_SIZE = 20
+
+
+def _prefetch_histories(tickers: list[str], period: str) -> None:
+    """
+    Downloads the history of every uncached ticker in batched yf.download
+    calls and stores it where `_cached_history` looks. Tickers the download
+    misses are simply left for the per-ticker fetch.
+    """
+    missing = [t for t in tickers if yahoo_cache.get(f"{t}|history|{period}", HISTORY_TTL) is None]
+    if len(missing) < 2:
+        return
+    for start in range(0, len(missing), HISTORY_BATCH_SIZE):
+        batch = missing[start:start + HISTORY_BATCH_SIZE]
+        try:
+            bulk = yf.download(batch, period=period, group_by='ticker', auto_adjust=True, threads=True, progress=False)
+        except Exception as e:
+            log.warning("Batched history download failed, fetching per ticker: %s", e)
+            continue
+        downloaded = set(bulk.columns.get_level_values(0))
+        for ticker_symbol in batch:
+            if ticker_symbol in downloaded:
+                columns = _history_columns(bulk[ticker_symbol].dropna(how='all'))
+                if columns:
+                    yahoo_cache.set(f"{ticker_symbol}|history|{period}", columns)
+
+
+def _cached_statement(ticker, statement_type: str) -> dict[str, float]:
+    """The first 10 non-empty line items of the most recent year of a financial statement."""
+    def fetch():
+        data = getattr(ticker, statement_type)
+        if data is None or data.empty:
+            return None
+        latest = data[data.columns[0]].head(10).dropna()
+        # Convert the whole column at once rather than boxing each value through Series.items().
+        return dict(zip(map(str, latest.index), latest.to_numpy(dtype=np.float64).tolist()))
+    return _fetch_cached(f"{ticker.ticker}|{statement_type}", STATEMENT_TTL, fetch) or {}
+
+
+METRIC_LABELS = {
+    "previousClose": "Previous Close", "open": "Open", "dayLow": "Day Low", "dayHigh": "Day High",
+    "regularMarketPrice": "Market Price", "currentPrice": "Current Price", "fiftyTwoWeekHigh": "52-Week High",
+    "fiftyTwoWeekLow": "52-Week Low", "volume": "Volume", "averageVolume": "Avg Volume", "marketCap": "Market Cap",
+    "enterpriseValue": "Enterprise Value", "trailingPE": "P/E Ratio", "forwardPE": "Forward P/E", "priceToSalesTrailing12Months": "P/S Ratio",
+    "enterpriseToRevenue": "EV/Revenue", "bookValue": "Book Value", "priceToBook": "P/B Ratio", "profitMargins": "Profit Margin",
+    "operatingMargins": "Operating Margin", "returnOnEquity": "ROE", "returnOnAssets": "ROA", "debtToEquity": "Debt/Equity",
+    "totalRevenue": "Total Revenue", "revenueGrowth": "Revenue Growth", "earningsGrowth": "Earnings Growth", "ebitda": "EBITDA",
+    "totalCash": "Total Cash", "totalDebt": "Total Debt", "dividendYield": "Dividend Yield", "dividendRate": "Dividend Rate",
+    "payoutRatio": "Payout Ratio", "exDividendDate": "Ex-Dividend Date", "sector": "Sector", "industry": "Industry",
+    "fullTimeEmployees": "Employees", "website": "Website", "businessSummary": "Business Summary"
+}
+
+
 def get_basic_info(ticker, metrics_to_fetch):
     try:
-        info = ticker.info
+        info = _cached_info(ticker)
         if not info:
             return "No basic info available."
 
@@ -201,29 +474,13 @@ def get_basic_info(ticker, metrics_to_fetch):
         result = [f"=== {company_name} ({ticker.ticker}) ==="]
         currency_symbol = get_currency_symbol(info)
 
-        metric_labels = {
-            "previousClose": "Previous Close", "open": "Open", "dayLow": "Day Low", "dayHigh": "Day High",
-            "regularMarketPrice": "Market Price", "currentPrice": "Current Price", "fiftyTwoWeekHigh": "52-Week High",
-            "fiftyTwoWeekLow": "52-Week Low", "volume": "Volume", "averageVolume": "Avg Volume", "marketCap": "Market Cap",
-            "enterpriseValue": "Enterprise Value", "trailingPE": "P/E Ratio", "forwardPE": "Forward P/E", "priceToSalesTrailing12Months": "P/S Ratio",
-            "enterpriseToRevenue": "EV/Revenue", "bookValue": "Book Value", "priceToBook": "P/B Ratio", "profitMargins": "Profit Margin",
-            "operatingMargins": "Operating Margin", "returnOnEquity": "ROE", "returnOnAssets": "ROA", "debtToEquity": "Debt/Equity",
-            "totalRevenue": "Total Revenue", "revenueGrowth": "Revenue Growth", "earningsGrowth": "Earnings Growth", "ebitda": "EBITDA",
-            "totalCash": "Total Cash", "totalDebt": "Total Debt", "dividendYield": "Dividend Yield", "dividendRate": "Dividend Rate",
-            "payoutRatio": "Payout Ratio", "exDividendDate": "Ex-Dividend Date", "sector": "Sector", "industry": "Industry",
-            "fullTimeEmployees": "Employees", "website": "Website", "businessSummary": "Business Summary"
-        }
-
         if metrics_to_fetch:
             for metric in metrics_to_fetch:
                 value = info.get(metric, 'N/A')
                 if value == 'N/A' or value is None:
                     continue
-                if metric in ['sector', 'industry', 'website', 'businessSummary', 'exDividendDate']:
-                    value_str = str(value)
-                else:
-                    value_str = format_currency_value(value, currency_symbol, metric)
-                label = metric_labels.get(metric, metric.replace('_', ' ').title())
+                value_str = format_currency_value(value, currency_symbol, metric)
+                label = METRIC_LABELS.get(metric, metric.replace('_', ' ').title())
                 result.append(f"• {label}: {value_str}")
         else:
             current_price = info.get('currentPrice', 'N/A')
@@ -250,21 +507,21 @@ def get_basic_info(ticker, metrics_to_fetch):
 
 def get_price_history(ticker, period="1mo"):
     try:
-        hist = ticker.history(period=period)
-        if hist.empty:
+        hist = _cached_history(ticker, period)
+        if not hist:
             return "No historical data available."
-        info = ticker.info
-        currency_symbol = get_currency_symbol(info)
-        latest = hist.iloc[-1]
-        first = hist.iloc[0]
-        change = ((latest['Close'] - first['Close']) / first['Close']) * 100
+        currency_symbol = get_currency_symbol(_cached_info(ticker))
+        # Pull the needed columns into one array and take every stat from it.
+        arr = np.array([hist[column] for column in _HISTORY_COLUMNS], dtype=np.float64)
+        start, end = arr[0, 0], arr[0, -1]
+        change = ((end - start) / start) * 100
         result = [f"=== Price History ({period}) ==="]
-        result.append(f"• Start Price: {currency_symbol}{first['Close']:.2f}")
-        result.append(f"• End Price: {currency_symbol}{latest['Close']:.2f}")
+        result.append(f"• Start Price: {currency_symbol}{start:.2f}")
+        result.append(f"• End Price: {currency_symbol}{end:.2f}")
         result.append(f"• Change: {change:+.2f}%")
-        result.append(f"• High: {currency_symbol}{hist['High'].max():.2f}")
-        result.append(f"• Low: {currency_symbol}{hist['Low'].min():.2f}")
-        result.append(f"• Avg Volume: {hist['Volume'].mean():,.0f}")
+        result.append(f"• High: {currency_symbol}{arr[1].max():.2f}")
+        result.append(f"• Low: {currency_symbol}{arr[2].min():.2f}")
+        result.append(f"• Avg Volume: {arr[3].mean():,.0f}")
         return "\n".join(result)
     except Exception as e:
         return f"Error getting price history: {e}"
@@ -272,7 +529,7 @@ def get_price_history(ticker, period="1mo"):
 
 def get_recent_news(ticker, max_items=5):
     try:
-        news = ticker.news
+        news = _cached_news(ticker)
         if not news:
             return "No recent news available."
         result = [f"=== Recent News ==="]
@@ -292,27 +549,21 @@ def get_recent_news(ticker, max_items=5):
 def get_financials(ticker, statement_type="financials"):
     try:
         if statement_type == "financials":
-            data = ticker.financials
             title = "Income Statement"
         elif statement_type == "balance_sheet":
-            data = ticker.balance_sheet
             title = "Balance Sheet"
         elif statement_type == "cashflow":
-            data = ticker.cashflow
             title = "Cash Flow Statement"
         else:
             return "Invalid financial statement type."
-        if data.empty:
+        latest_data = _cached_statement(ticker, statement_type)
+        if not latest_data:
             return f"No {title.lower()} data available."
-        info = ticker.info
-        currency_symbol = get_currency_symbol(info)
+        currency_symbol = get_currency_symbol(_cached_info(ticker))
         result = [f"=== {title} (Most Recent Year) ==="]
-        latest_col = data.columns[0]
-        latest_data = data[latest_col]
-        for idx, (item, value) in enumerate(latest_data.head(10).items()):
-            if pd.notna(value):
-                value_str = f"{currency_symbol}{value:,.0f}" if abs(value) > 1000 else f"{currency_symbol}{value:,.2f}"
-                result.append(f"• {item}: {value_str}")
+        for item, value in latest_data.items():
+            value_str = f"{currency_symbol}{value:,.0f}" if abs(value) > 1000 else f"{currency_symbol}{value:,.2f}"
+            result.append(f"• {item}: {value_str}")
         return "\n".join(result)
     except Exception as e:
         return f"Error getting {statement_type}: {e}"
@@ -322,8 +573,7 @@ def get_earnings_info(ticker):
     try:
         calendar = ticker.calendar
         earnings = ticker.earnings
-        info = ticker.info
-        currency_symbol = get_currency_symbol(info)
+        currency_symbol = get_currency_symbol(_cached_info(ticker))
         result = [f"=== Earnings Information ==="]
         if calendar is not None and not calendar.empty:
             next_earnings = calendar.index[0].strftime('%Y-%m-%d')
@@ -339,92 +589,132 @@ def get_earnings_info(ticker):
         return f"Error getting earnings info: {e}"
 
 
-def get_stock_data(query: str, api_key: str) -> str:
+def _info_section(ticker, ticker_symbol, metrics) -> list[str]:
+    info = _cached_info(ticker)
+    if not info or 'symbol' not in info:
+        return [f"Unable to retrieve info for {ticker_symbol}"]
+    
+    company_name = info.get('longName', ticker_symbol)
+    ticker_results = [f"=== {company_name} ({ticker_symbol}) ==="]
+    
+    # If specific metrics requested, show only those
+    if metrics:
+        for metric in metrics:
+            value = info.get(metric, "N/A")
+            # Format metric name nicely
+            metric_display = metric.replace('_', ' ').title()
+            if metric == "trailingPE":
+                metric_display = "P/E Ratio"
+            elif metric == "forwardPE":
+                metric_display = "Forward P/E"
+            elif metric == "marketCap":
+                metric_display = "Market Cap"
+                if value != "N/A":
+                    value = f"${value:,.0f}"
+            
+            ticker_results.append(f"• {metric_display}: {value}")
+    else:
+        # Default metrics if none specified
+        ticker_results.append(f"• Current Price: ${info.get('currentPrice', 'N/A')}")
+        ticker_results.append(f"• P/E Ratio: {info.get('trailingPE', 'N/A')}")
+        ticker_results.append(f"• Market Cap: ${info.get('marketCap', 'N/A'):,}")
+    return ticker_results
+
+
+def _news_section(ticker, ticker_symbol, metrics) -> list[str]:
+    try:
+        news = _cached_news(ticker)
+        return ["\n=== Recent News ===", format_news_safely(news)]
+    except Exception as e:
+        return [f"\n=== Recent News ===", f"• Unable to retrieve news: {str(e)}"]
+
+
+def _history_section(ticker, ticker_symbol, metrics) -> list[str]:
+    try:
+        hist = _cached_history(ticker, "1mo")
+        if hist:
+            ticker_results = ["\n=== Recent Price History (Last 5 Days) ==="]
+            for date, close, volume in zip(hist['Date'][-5:], hist['Close'][-5:], hist['Volume'][-5:]):
+                ticker_results.append(f"• {date}: Close=${close:.2f}, Volume={volume:,.0f}")
+            return ticker_results
+        return ["\n=== Recent Price History ===", "• No historical data available"]
+    except Exception as e:
+        return [f"\n=== Recent Price History ===", f"• Unable to retrieve history: {str(e)}"]
+
+
+# data type -> section builder; other data types (financials, balance_sheet, etc.) are not rendered yet.
+_SECTION_HANDLERS = {
+    "info": _info_section,
+    "news": _news_section,
+    "history": _history_section,
+}
+# Upper bound on concurrent yfinance requests. The pool is shared across
+# queries so its threads are reused instead of being spawned per call.
+MAX_FETCH_WORKERS = 16
+_fetch_executor = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix="yfinance")
+
+# yf.Ticker memoizes what it has downloaded (info, news, ...), so repeat
+# queries for a symbol within a few minutes reuse the same object. Pooled
+# objects expire with the info cache entry: a stale in-memory .info must not
+# be written back to disk as fresh once that entry runs out.
+_ticker_pool = TTLCache(maxsize=256, ttl=INFO_TTL)
+_ticker_pool_lock = threading.Lock()
+
+
+def _get_ticker(ticker_symbol: str) -> yf.Ticker:
+    with _ticker_pool_lock:
+        ticker = _ticker_pool.get(ticker_symbol)
+        if ticker is None:
+            ticker = _ticker_pool[ticker_symbol] = yf.Ticker(ticker_symbol)
+        return ticker
+
+
+def _ticker_lines(futures: dict, ticker_symbol: str, data_types: list[str]):
+    """Yields a ticker's section lines straight from the section futures, in the requested order."""
+    for data_type in data_types:
+        future = futures.get((ticker_symbol, data_type))
+        if future is not None:
+            yield from future.result()
+
+
+def get_stock_data(query: str, api_key: str, entities: dict | None = None) -> str:
     """
     Main entry point for Yahoo Finance data retrieval.
-    Uses Gemini to extract tickers, metrics, and data types from natural language query.
+    Uses Gemini to extract tickers, metrics, and data types from natural language query,
+    unless the workflow already supplies the extracted `entities`.
     """
-    print(f"[Yahoo Finance] Processing query: '{query}'")
+    log.info("Processing query: '%s'", query)
     
-    entities = extract_financial_entities(query, api_key)
+    if entities is None:
+        entities = extract_financial_entities(query, api_key)
     tickers = entities.get("tickers", [])
     metrics = entities.get("metrics", [])
     data_types = entities.get("data_types", ["info"])
     
-    print(f"[Yahoo Finance] Tickers: {tickers}")
-    print(f"[Yahoo Finance] Metrics: {metrics}")
-    print(f"[Yahoo Finance] Data Types: {data_types}")
+    log.info("tickers=%s, metrics=%s, data_types=%s", tickers, metrics, data_types)
     
     if not tickers:
         return "Could not identify any stock tickers in the query."
     
+    # Every (ticker, data type) section is fetched concurrently; each yfinance
+    # Ticker comes from the pool and is shared by its sections.
+    yf_tickers = {ticker_symbol: _get_ticker(ticker_symbol) for ticker_symbol in tickers}
+    tasks = [(ticker_symbol, data_type) for ticker_symbol in tickers for data_type in data_types if data_type in _SECTION_HANDLERS]
+    submit = lambda ticker_symbol, data_type: _fetch_executor.submit(
+        _SECTION_HANDLERS[data_type], yf_tickers[ticker_symbol], ticker_symbol, metrics
+    )
+    futures = {task: submit(*task) for task in tasks if task[1] != "history"}
+    # History sections start once the batched download has filled the cache,
+    # while the other sections are already running.
+    if "history" in data_types:
+        _prefetch_histories(tickers, "1mo")
+        futures.update((task, submit(*task)) for task in tasks if task[1] == "history")
+    
     all_results = []
     
     for ticker_symbol in tickers:
         try:
-            ticker = yf.Ticker(ticker_symbol)
-            ticker_results = []
-            
-            # Process each requested data type
-            for data_type in data_types:
-                if data_type == "info":
-                    info = ticker.info
-                    if not info or 'symbol' not in info:
-                        ticker_results.append(f"Unable to retrieve info for {ticker_symbol}")
-                        continue
-                    
-                    company_name = info.get('longName', ticker_symbol)
-                    ticker_results.append(f"=== {company_name} ({ticker_symbol}) ===")
-                    
-                    # If specific metrics requested, show only those
-                    if metrics:
-                        for metric in metrics:
-                            value = info.get(metric, "N/A")
-                            # Format metric name nicely
-                            metric_display = metric.replace('_', ' ').title()
-                            if metric == "trailingPE":
-                                metric_display = "P/E Ratio"
-                            elif metric == "forwardPE":
-                                metric_display = "Forward P/E"
-                            elif metric == "marketCap":
-                                metric_display = "Market Cap"
-                                if value != "N/A":
-                                    value = f"${value:,.0f}"
-                            
-                            ticker_results.append(f"• {metric_display}: {value}")
-                    else:
-                        # Default metrics if none specified
-                        ticker_results.append(f"• Current Price: ${info.get('currentPrice', 'N/A')}")
-                        ticker_results.append(f"• P/E Ratio: {info.get('trailingPE', 'N/A')}")
-                        ticker_results.append(f"• Market Cap: ${info.get('marketCap', 'N/A'):,}")
-                
-                elif data_type == "news":
-                    try:
-                        news = ticker.news
-                        ticker_results.append("\n=== Recent News ===")
-                        ticker_results.append(format_news_safely(news))
-                    except Exception as e:
-                        ticker_results.append(f"\n=== Recent News ===")
-                        ticker_results.append(f"• Unable to retrieve news: {str(e)}")
-                
-                elif data_type == "history":
-                    try:
-                        hist = ticker.history(period="1mo")
-                        if not hist.empty:
-                            ticker_results.append("\n=== Recent Price History (Last 5 Days) ===")
-                            for date, row in hist.tail(5).iterrows():
-                                ticker_results.append(f"• {date.strftime('%Y-%m-%d')}: Close=${row['Close']:.2f}, Volume={row['Volume']:,.0f}")
-                        else:
-                            ticker_results.append("\n=== Recent Price History ===")
-                            ticker_results.append("• No historical data available")
-                    except Exception as e:
-                        ticker_results.append(f"\n=== Recent Price History ===")
-                        ticker_results.append(f"• Unable to retrieve history: {str(e)}")
-                
-                # Add other data types as needed (financials, balance_sheet, etc.)
-            
-            all_results.append("\n".join(ticker_results))
-            
+            all_results.append("\n".join(_ticker_lines(futures, ticker_symbol, data_types)))
         except Exception as e:
             all_results.append(f"Error retrieving data for {ticker_symbol}: {str(e)}")
     
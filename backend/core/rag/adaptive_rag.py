@@ -17,6 +17,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from typing import Literal, List
 from pydantic import BaseModel, Field
 from langchain_core.messages import HumanMessage, SystemMessage
+from functools import lru_cache
 
 class RouteQuery(BaseModel):
     """Enhanced routing for specific financial data sources"""
@@ -129,10 +130,15 @@ You are an expert financial data routing engine. Your primary function is to ana
 → primary: sec_edgar, secondary: [], query_type: company_analysis, confidence: 1.0
 """
 
+@lru_cache(maxsize=8)
+def _get_router(api_key: str):
+    # One structured client per user key, reused across queries (and its HTTP connection with it).
+    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", temperature=0.5, api_key=api_key)
+    return llm.with_structured_output(RouteQuery)
+
 def route_financial_query(user_question: str, api_key: str) -> RouteQuery:
     """Route a user's financial question to appropriate data sources"""
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", temperature=0.5, api_key=api_key)
-    structured_llm_router = llm.with_structured_output(RouteQuery)
+    structured_llm_router = _get_router(api_key)
 
     message = HumanMessage(content=f"Route this financial question: {user_question}")
     system_msg = SystemMessage(content=router_instructions)
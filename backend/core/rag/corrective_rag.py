@@ -3,6 +3,7 @@
 from typing import List, Dict, Optional
 from pydantic import BaseModel, Field
 from langchain_core.messages import HumanMessage, SystemMessage
+from functools import lru_cache
 from backend.config import settings
 # from langchain_mistralai import ChatMistralAI
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -33,10 +34,15 @@ You are a financial data reconciliation expert. Compare information from multipl
 5. Resolve final value based on most reliable sources
 """
 
+@lru_cache(maxsize=8)
+def _get_fact_checker(api_key: str):
+    # One structured client per user key, reused across queries (and its HTTP connection with it).
+    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", temperature=0.5, api_key=api_key)
+    return llm.with_structured_output(FactCheckResult)
+
 def verify_facts(sources: List[Dict[str, str]], query: str, api_key: str) -> FactCheckResult:
     """Cross-check financial information from multiple sources"""
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-lite", temperature=0.5, api_key=api_key)
-    structured_fact_checker = llm.with_structured_output(FactCheckResult)
+    structured_fact_checker = _get_fact_checker(api_key)
 
     sources_text = "\n".join(
         f"Source {i+1} ({s['source']}): {s['content'][:1000]}"
@@ -1,5 +1,7 @@
 # backend/core/rag/financial_workflow.py
 
+import asyncio
+import inspect
 from typing import List, TypedDict
 
 from langgraph.graph import StateGraph, END
@@ -12,7 +14,7 @@ from backend.core.rag.adaptive_rag import route_financial_query, RouteQuery
 from backend.core.rag.self_rag import check_quality, QualityCheck
 from backend.core.rag.corrective_rag import verify_facts
 
-from core.data_sources import (
+from backend.core.data_sources import (
     yahoo_finance,
     # alpha_vantage,
     fred,
@@ -36,6 +38,7 @@ class GraphState(TypedDict):
     user_question: str
     google_api_key: str
     route: RouteQuery
+    entities: dict | None
     documents: List[Document]
     final_answer: str
 
@@ -46,14 +49,17 @@ class GraphState(TypedDict):
 tool_map = {
     "yahoo_finance": yahoo_finance.get_stock_data,
     # "alpha_vantage": alpha_vantage.get_technical_indicators,
-    "fred": fred.get_economic_data,
-    "newsapi": newsapi.get_financial_news,
+    "fred": fred.aget_economic_data,
+    "newsapi": newsapi.aget_financial_news,
     "tavily": tavily.search_web,
     "sec_edgar": sec_edgar.get_sec_filings,
     "coindesk": coindesk.get_latest_tick_data,
     "polygon_io": polygon.get_technical_indicators,
 }
 
+# Tools that consume the shared ticker/crypto extraction via an `entities` kwarg.
+ENTITY_SOURCES = {"yahoo_finance", "newsapi", "sec_edgar", "coindesk", "polygon_io"}
+
 # --- 3. Define Graph Nodes ---
 
 def route_query_node(state: GraphState) -> dict:
@@ -63,28 +69,48 @@ def route_query_node(state: GraphState) -> dict:
     print(f"Route: Primary -> {route.primary_datasource}, Secondary -> {route.secondary_sources}")
     return {"route": route}
 
-def retrieve_documents_node(state: GraphState) -> dict:
+async def _call_tool(tool, question: str, api_key: str, **kwargs) -> str:
+    """Runs async tools on the event loop and blocking ones in a worker thread."""
+    if inspect.iscoroutinefunction(tool):
+        return await tool(question, api_key=api_key, **kwargs)
+    return await asyncio.to_thread(tool, question, api_key=api_key, **kwargs)
+
+async def retrieve_documents_node(state: GraphState) -> dict:
     """Node 2: Retrieve documents from the chosen sources."""
     print("--- NODE: RETRIEVING DOCUMENTS ---")
     question = state["user_question"]
+    api_key = state["google_api_key"]
     route = state["route"]
     
     # Combine primary and secondary sources, removing duplicates
     all_source_names = list(set([route.primary_datasource] + route.secondary_sources))
-    documents = []
-    
     for source_name in all_source_names:
-        if source_name in tool_map:
-            tool = tool_map[source_name]
-            print(f"Calling tool: {source_name}")
-            content = tool(question, api_key=state["google_api_key"]) 
-            documents.append({"source": source_name, "content": content, "quality_check": None})
-        else:
+        if source_name not in tool_map:
             print(f"Warning: Source '{source_name}' not found in tool map.")
+    source_names = [name for name in all_source_names if name in tool_map]
+
+    # Extract tickers/crypto instruments once for every tool that needs them,
+    # instead of one Gemini round-trip per tool.
+    entities = state.get("entities")
+    if entities is None and ENTITY_SOURCES.intersection(source_names):
+        entities = await asyncio.to_thread(yahoo_finance.extract_financial_entities, question, api_key)
+
+    calls = []
+    for source_name in source_names:
+        print(f"Calling tool: {source_name}")
+        extra = {"entities": entities} if source_name in ENTITY_SOURCES else {}
+        calls.append(_call_tool(tool_map[source_name], question, api_key, **extra))
+
+    # The tools are independent network calls, so run them concurrently.
+    contents = await asyncio.gather(*calls)
+    documents = [
+        {"source": source_name, "content": content, "quality_check": None}
+        for source_name, content in zip(source_names, contents)
+    ]
     
-    return {"documents": documents}
+    return {"documents": documents, "entities": entities}
 
-def quality_filter_node(state: GraphState) -> dict:
+async def quality_filter_node(state: GraphState) -> dict:
     """Node 3: Assess document quality and filter out bad ones (Self-RAG)."""
     print("--- NODE: ASSESSING DOCUMENT QUALITY ---")
     question = state["user_question"]
@@ -96,19 +122,27 @@ def quality_filter_node(state: GraphState) -> dict:
         print(f"    Content: {doc['content']}")
         print("    ---")
 
-    for doc in state["documents"]:
-        try:
-            quality_check = check_quality(doc["source"], doc["content"], question, state["google_api_key"])
-            if quality_check and quality_check.is_relevant and quality_check.confidence >= 0.4:
-                print(f"✅ Quality Check Passed for {doc['source']}: Confidence={quality_check.confidence}")
-                doc_copy = doc.copy()
-                doc_copy["quality_check"] = quality_check
-                documents_with_checks.append(doc_copy)
-            else:
-                reason = "Irrelevant" if quality_check and not quality_check.is_relevant else "LLM Parsing Error/Low Confidence"
-                print(f"--- FILTERED OUT: {doc['source']} ({reason}) ---")
-        except Exception as e:
-            print(f"--- ERROR checking quality for {doc['source']}: {e} ---")
+    # One LLM grading call per document; overlap them instead of running serially.
+    results = await asyncio.gather(
+        *(
+            asyncio.to_thread(check_quality, doc["source"], doc["content"], question, state["google_api_key"])
+            for doc in state["documents"]
+        ),
+        return_exceptions=True,
+    )
+
+    for doc, quality_check in zip(state["documents"], results):
+        if isinstance(quality_check, Exception):
+            print(f"--- ERROR checking quality for {doc['source']}: {quality_check} ---")
+            continue
+        if quality_check and quality_check.is_relevant and quality_check.confidence >= 0.4:
+            print(f"✅ Quality Check Passed for {doc['source']}: Confidence={quality_check.confidence}")
+            doc_copy = doc.copy()
+            doc_copy["quality_check"] = quality_check
+            documents_with_checks.append(doc_copy)
+        else:
+            reason = "Irrelevant" if quality_check and not quality_check.is_relevant else "LLM Parsing Error/Low Confidence"
+            print(f"--- FILTERED OUT: {doc['source']} ({reason}) ---")
             
     return {"documents": documents_with_checks}
 
@@ -5,7 +5,8 @@ from pydantic import BaseModel, Field
 from langchain_core.messages import HumanMessage, SystemMessage
 from backend.config import settings
 from langchain_google_genai import ChatGoogleGenerativeAI
-import json
+import orjson
+from functools import lru_cache
 import re
 
 # Use a more stable model for structured output
@@ -15,6 +16,9 @@ import re
 #     api_key=settings.GOOGLE_API_KEY
 # )
 
+# A JSON object with at most one level of nested braces, compiled once for all checks.
+_JSON_OBJECT_RE = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL)
+
 class QualityCheck(BaseModel):
     """Results of quality assessment for financial data"""
     is_recent: bool = Field(..., description="Is the information current (within last 3 months)?")
@@ -121,19 +125,27 @@ YOU MUST RESPOND WITH ONLY VALID JSON IN THIS EXACT FORMAT:
 DO NOT include any other text, explanations, or markdown formatting. ONLY the JSON object.
 """
 
-def check_quality(source: str, content: str, query: str, api_key: str) -> QualityCheck:
-    """Evaluate the quality of financial information"""
-    llm = ChatGoogleGenerativeAI(
+@lru_cache(maxsize=8)
+def _get_quality_llm(api_key: str) -> ChatGoogleGenerativeAI:
+    # One client per user key: every retrieved document is checked, so this
+    # is reused many times per query.
+    return ChatGoogleGenerativeAI(
         model="gemini-2.5-flash-lite", 
         temperature=0.3,  # Lower temperature for more consistent JSON
         api_key=api_key
     )
 
+def check_quality(source: str, content: str, query: str, api_key: str) -> QualityCheck:
+    """Evaluate the quality of financial information"""
+    llm = _get_quality_llm(api_key)
+
+    # The fixed verdicts below are built from trusted literals, so they use
+    # model_construct() and skip validation; only LLM output is validated.
     try:
         # Check for empty or very short content
         if not content or len(content.strip()) < 10:
             print(f"[Quality Check] Content too short for {source}")
-            return QualityCheck(
+            return QualityCheck.model_construct(
                 is_recent=False, 
                 is_reliable=False, 
                 is_relevant=False, 
@@ -146,7 +158,7 @@ def check_quality(source: str, content: str, query: str, api_key: str) -> Qualit
         content_lower = content.lower()
         if any(keyword in content_lower for keyword in error_keywords) and len(content) < 200:
             print(f"[Quality Check] Error detected in content for {source}")
-            return QualityCheck(
+            return QualityCheck.model_construct(
                 is_recent=False, 
                 is_reliable=False, 
                 is_relevant=False, 
@@ -157,7 +169,7 @@ def check_quality(source: str, content: str, query: str, api_key: str) -> Qualit
         # Check for "No title - Unknown" pattern (failed news retrieval)
         if "No title - Unknown" in content:
             print(f"[Quality Check] Failed data retrieval detected in {source}")
-            return QualityCheck(
+            return QualityCheck.model_construct(
                 is_recent=False, 
                 is_reliable=False, 
                 is_relevant=False, 
@@ -168,7 +180,7 @@ def check_quality(source: str, content: str, query: str, api_key: str) -> Qualit
         if source in SOFT_RECENCY_SOURCES:
             # Accept news if it clearly contains headlines
             if "Title:" in content or "Top news related to" in content:
-                return QualityCheck(
+                return QualityCheck.model_construct(
                     is_recent=True,        # allow future-dated or aggregated news
                     is_reliable=True,
                     is_relevant=True,
@@ -194,10 +206,10 @@ def check_quality(source: str, content: str, query: str, api_key: str) -> Qualit
         print(f"[DEBUG Quality Check] Raw LLM response for {source}: {response_text[:200]}")
         
         # Extract JSON from the response
-        json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response_text, re.DOTALL)
+        json_match = _JSON_OBJECT_RE.search(response_text)
         if json_match:
             json_str = json_match.group(0)
-            data = json.loads(json_str)
+            data = orjson.loads(json_str)
             
             # Validate and create QualityCheck object
             result = QualityCheck(
@@ -212,7 +224,7 @@ def check_quality(source: str, content: str, query: str, api_key: str) -> Qualit
             return result
         else:
             print(f"[Quality Check] No JSON found in LLM response for {source}")
-            return QualityCheck(
+            return QualityCheck.model_construct(
                 is_recent=False, 
                 is_reliable=False, 
                 is_relevant=False, 
@@ -220,9 +232,9 @@ def check_quality(source: str, content: str, query: str, api_key: str) -> Qualit
                 issues=["Failed to parse LLM response as JSON"]
             )
         
-    except json.JSONDecodeError as je:
+    except orjson.JSONDecodeError as je:
         print(f"[Quality Check] JSON decode error for {source}: {je}")
-        return QualityCheck(
+        return QualityCheck.model_construct(
             is_recent=False, 
             is_reliable=False, 
             is_relevant=False, 
@@ -233,7 +245,7 @@ def check_quality(source: str, content: str, query: str, api_key: str) -> Qualit
         print(f"Quality check internal error for {source}: {e}")
         import traceback
         print(traceback.format_exc())
-        return QualityCheck(
+        return QualityCheck.model_construct(
             is_recent=False, 
             is_reliable=False, 
             is_relevant=False, 
@@ -1,5 +1,7 @@
 # main.py
 
+import importlib.util
+
 import uvicorn
 
 if __name__ == "__main__":
@@ -9,4 +11,7 @@ if __name__ == "__main__":
     # This string tells uvicorn where to find the FastAPI app instance:
     # "backend.api": the Python module path (folder.file)
     # "app": the variable inside that module that holds the FastAPI instance
-    uvicorn.run("backend.api:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # uvloop (libuv-based event loop) and httptools (C HTTP parser) come with
+    # uvicorn[standard]. uvloop does not support Windows, so fall back there.
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    uvicorn.run("backend.api:app", host="0.0.0.0", port=8000, reload=True, loop=loop, http="httptools")
\ No newline at end of file